@@ -0,0 +1,81 @@
+"""
+Compact columnar encoding for a cycle's alerts.
+
+Instead of one 'new_alert' message per rule hit, every triggered alert of a
+cycle goes out in a single frame:
+
+    {
+        'time': '10:15 AM',
+        'fields': ['Value', 'RSI', 'Bollinger_%b', ...],   # shared schema header
+        'types': ['green', 'blue', 'red', 'orange'],
+        'symbols': ['INFY.NS', 'TCS.NS'],
+        'columns': [[1890.5, 4012.25], [8.1, 42.7], ...],  # one list per field, one entry per symbol
+        'alerts': [[0, 1], [1, 2], [0, 0]]                 # (symbol index, type index)
+    }
+
+Metrics are sent once per symbol even when both the Bollinger and the RSI
+rule fire for it; a missing metric is null in its column.
+"""
+
+ALERT_TYPES = ['green', 'blue', 'red', 'orange']
+
+# Known metrics in display order; anything else is appended after these
+ALERT_FIELDS = [
+    'Value',
+    'RSI',
+    'Bollinger_%b',
+    'Day High',
+    'Day Low',
+]
+for _period in ['1 day', '5 days', '20 days', '1 year']:
+    ALERT_FIELDS += [
+        f'Value change ({_period})',
+        f'% change ({_period})',
+        f'High ({_period} ago)',
+        f'Low ({_period} ago)',
+    ]
+
+# Decimals kept on the wire; the dashboard shows two
+VALUE_DECIMALS = 4
+
+
+def compact_value(value):
+    if isinstance(value, float):
+        return round(value, VALUE_DECIMALS)
+    return value
+
+
+def encode_columns(rows, symbols):
+    """Shared schema header plus one column per field for the given symbol rows."""
+    extra_fields = []
+    for symbol in symbols:
+        for key in rows[symbol]:
+            if key not in ('symbol', 'type', 'time') and key not in ALERT_FIELDS and key not in extra_fields:
+                extra_fields.append(key)
+    fields = ALERT_FIELDS + extra_fields
+    columns = [[compact_value(rows[symbol].get(field)) for symbol in symbols] for field in fields]
+    return fields, columns
+
+
+def encode_alerts(alerts, time):
+    symbols = []
+    symbol_index = {}
+    rows = {}
+    pairs = []
+    for alert_data in alerts:
+        symbol = alert_data['symbol']
+        if symbol not in symbol_index:
+            symbol_index[symbol] = len(symbols)
+            symbols.append(symbol)
+            rows[symbol] = alert_data
+        pairs.append([symbol_index[symbol], ALERT_TYPES.index(alert_data['type'])])
+
+    fields, columns = encode_columns(rows, symbols)
+    return {
+        'time': str(time),
+        'fields': fields,
+        'types': ALERT_TYPES,
+        'symbols': symbols,
+        'columns': columns,
+        'alerts': pairs,
+    }
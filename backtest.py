@@ -0,0 +1,219 @@
+"""
+Vectorized replay of the live alert rules over stored history.
+
+The %b and RSI series are computed for every symbol and every bar at once
+with the panel engine, then the thresholds from collect_alerts in app.py
+become boolean masks over the (time x symbol) arrays. Each hit is
+reported with the bars and time since that rule's previous hit for the
+symbol and the forward returns after it.
+
+Live alerts repeat on every cycle while a condition holds, so hits are
+also grouped into episodes: consecutive bars with the same rule hit.
+
+    python backtest.py                       # watch list, 1h and 1d history from the bar store
+    python backtest.py --update --events-csv events.csv --summary-csv summary.csv
+    python backtest.py --symbols INFY.NS TCS.NS --intervals 1d
+
+Indicators are taken over the whole stored history, so the first bars
+after the %b window fills can differ slightly from what the live server
+computed on its 3-month download.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import bar_store
+import indicator_engine
+import symbol_registry
+import universe
+
+# The thresholds of collect_alerts, first match wins within each indicator
+BOLLINGER_RULES = [
+    ('green', '<', -10),
+    ('blue', '<', 0),
+    ('red', '>', 120),
+    ('orange', '>', 100),
+]
+RSI_RULES = [
+    ('green', '<', 5),
+    ('blue', '<', 10),
+    ('red', '>', 95),
+    ('orange', '>', 90),
+]
+
+# History replayed for each interval, as kept by the server
+BACKTEST_PERIODS = {
+    '1h': '3mo',
+    '1d': '2y',
+}
+
+# Forward-return horizons in bars: about a day, a week and a month ahead
+FORWARD_BARS = {
+    '1h': (1, 7, 35),
+    '1d': (1, 5, 20),
+}
+
+_NAT = np.iinfo(np.int64).min
+
+
+def rule_types(values, rules):
+    """Index into rules of the first matching rule per cell, -1 for none."""
+    conditions = []
+    with np.errstate(invalid='ignore'):
+        for _, op, threshold in rules:
+            conditions.append(values < threshold if op == '<' else values > threshold)
+    return np.select(conditions, np.arange(len(rules)), default=-1)
+
+
+def aligned_timestamps(stock_data, stock_symbols):
+    """Bar times (int64 ns) laid out like indicator_engine.build_panel's panels."""
+    stock_data = stock_data.sort_index()
+    close = stock_data.xs('Close', axis=1, level=1).reindex(columns=stock_symbols).to_numpy(dtype='float64')
+    index = stock_data.index
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    stamps = np.broadcast_to(index.values.astype('datetime64[ns]').astype('int64')[:, None], close.shape)
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind='stable')
+    aligned = np.take_along_axis(stamps, order, axis=0).copy()
+    aligned[~np.take_along_axis(valid, order, axis=0)] = _NAT
+    return aligned
+
+
+def indicator_panels(stock_data, stock_symbols):
+    panels, counts = indicator_engine.build_panel(stock_data, stock_symbols)
+    ohlc4 = indicator_engine.ohlc4_panel(panels)
+    bollinger_b = indicator_engine.percent_b_panel(ohlc4, indicator_engine.BB_LENGTH, indicator_engine.BB_STD,
+                                                   mamode='ema')
+    rsi = indicator_engine.rsi_panel(ohlc4, indicator_engine.RSI_LENGTH)
+    # Live bands only exist once a full %b window is there
+    rows = np.arange(len(ohlc4))[:, None]
+    warm = rows >= len(ohlc4) - counts + max(indicator_engine.BB_LENGTH, indicator_engine.RSI_LENGTH) - 1
+    bollinger_b = np.where(warm, bollinger_b, np.nan)
+    rsi = np.where(warm, rsi, np.nan)
+    return panels['Close'], bollinger_b, rsi
+
+
+def replay(stock_data, stock_symbols, interval):
+    """One row per (bar, symbol, rule) hit over the given history."""
+    columns = ['symbol', 'interval', 'indicator', 'type', 'time', 'value', 'close',
+               'episode_start', 'bars_since_previous', 'time_since_previous']
+    horizons = FORWARD_BARS[interval]
+    columns += [f'return_{h}' for h in horizons]
+    if stock_data is None or stock_data.empty:
+        return pd.DataFrame(columns=columns)
+
+    close, bollinger_b, rsi = indicator_panels(stock_data, stock_symbols)
+    stamps = aligned_timestamps(stock_data, stock_symbols)
+    n_rows = close.shape[0]
+
+    frames = []
+    for indicator, values, rules in (('Bollinger_%b', bollinger_b, BOLLINGER_RULES), ('RSI', rsi, RSI_RULES)):
+        types = rule_types(values, rules)
+        for type_index, (alert_type, _, _) in enumerate(rules):
+            hits = types == type_index
+            # Column-major so each symbol's hits come out in time order
+            cols, rows = np.nonzero(hits.T)
+            if len(rows) == 0:
+                continue
+            previous_row = np.vstack([np.zeros((1, hits.shape[1]), dtype=bool), hits[:-1]])
+            episode_start = ~previous_row[rows, cols]
+
+            # Gap to this rule's previous hit for the same symbol
+            same_symbol = np.concatenate([[False], cols[1:] == cols[:-1]])
+            prior = np.maximum(np.arange(len(rows)) - 1, 0)
+            bars_since = np.where(same_symbol, rows - rows[prior], -1)
+            time_since = np.where(same_symbol, stamps[rows, cols] - stamps[rows[prior], cols], _NAT)
+
+            frame = pd.DataFrame({
+                'symbol': np.asarray(stock_symbols, dtype=object)[cols],
+                'interval': interval,
+                'indicator': indicator,
+                'type': alert_type,
+                'time': pd.to_datetime(stamps[rows, cols], unit='ns', utc=True),
+                'value': values[rows, cols],
+                'close': close[rows, cols],
+                'episode_start': episode_start,
+                'bars_since_previous': pd.array(np.where(bars_since >= 0, bars_since, 0), dtype='Int64'),
+                'time_since_previous': pd.to_timedelta(np.where(time_since != _NAT, time_since, 0), unit='ns'),
+            })
+            frame.loc[bars_since < 0, 'bars_since_previous'] = pd.NA
+            frame.loc[time_since == _NAT, 'time_since_previous'] = pd.NaT
+            for h in horizons:
+                ahead = rows + h
+                inside = ahead < n_rows
+                forward = np.full(len(rows), np.nan)
+                forward[inside] = close[ahead[inside], cols[inside]] / close[rows[inside], cols[inside]] - 1
+                frame[f'return_{h}'] = forward * 100
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    events = pd.concat(frames, ignore_index=True)
+    return events.sort_values(['symbol', 'time', 'indicator'], kind='stable', ignore_index=True)
+
+
+def summarize(events):
+    """Per symbol and rule: hits, episodes, median quiet time before an episode and mean forward returns."""
+    if events.empty:
+        return pd.DataFrame()
+    keys = ['symbol', 'interval', 'indicator', 'type']
+    return_columns = [column for column in events.columns if column.startswith('return_')]
+    grouped = events.groupby(keys, sort=True)
+    summary = grouped.size().to_frame('hits')
+    summary['episodes'] = grouped['episode_start'].sum()
+    starts = events[events['episode_start']]
+    gaps = starts.groupby(keys)['time_since_previous']
+    summary['median_time_between'] = gaps.median()
+    summary['last_alert'] = grouped['time'].max()
+    # Forward returns are measured from each episode's first bar
+    for column in return_columns:
+        summary[f'mean_{column}'] = starts.groupby(keys)[column].mean()
+    return summary.reset_index()
+
+
+def run_backtest(stock_symbols, intervals=tuple(BACKTEST_PERIODS), update=False):
+    events = []
+    for interval in intervals:
+        period = BACKTEST_PERIODS[interval]
+        if update:
+            stock_data = bar_store.update_bars(stock_symbols, period=period, interval=interval)
+        else:
+            stock_data = bar_store.read_bars(stock_symbols, period=period, interval=interval)
+        events.append(replay(stock_data, stock_symbols, interval))
+    events = pd.concat(events, ignore_index=True) if events else pd.DataFrame()
+    return events, summarize(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the alert thresholds over stored history.")
+    parser.add_argument('--symbols', nargs='+', help="defaults to the watch list in universe.json")
+    parser.add_argument('--intervals', nargs='+', default=list(BACKTEST_PERIODS), choices=list(BACKTEST_PERIODS))
+    parser.add_argument('--update', action='store_true', help="bring the bar store up to date first")
+    parser.add_argument('--events-csv', help="write every alert hit to this file")
+    parser.add_argument('--summary-csv', help="write the per-symbol summary to this file")
+    args = parser.parse_args()
+
+    stock_symbols = args.symbols or symbol_registry.filter_valid(universe.symbols('watch'))
+    start = time.perf_counter()
+    events, summary = run_backtest(stock_symbols, args.intervals, update=args.update)
+    elapsed = time.perf_counter() - start
+
+    if args.events_csv:
+        events.to_csv(args.events_csv, index=False)
+    if args.summary_csv:
+        summary.to_csv(args.summary_csv, index=False)
+    if not summary.empty:
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(summary.to_string(index=False))
+        totals = events.groupby(['interval', 'indicator', 'type']).agg(hits=('symbol', 'size'),
+                                                                       episodes=('episode_start', 'sum'))
+        print(f"\n{totals}")
+    print(f"\nReplayed {len(stock_symbols)} symbols over {', '.join(args.intervals)} in {elapsed:.2f}s: "
+          f"{len(events)} hits")
+
+
+if __name__ == '__main__':
+    main()
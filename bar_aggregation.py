@@ -0,0 +1,263 @@
+"""
+Multi-timeframe OHLCV bars derived from the base bars already held.
+
+5m, 15m and 1h bars are built from minute bars, 2h, 4h and 1d bars from
+hourly bars, so a new timeframe needs no download of its own. Buckets are
+aligned to the NSE session like yfinance's own bars: intraday buckets start
+at 09:15 IST (09:15, 10:15, ... for 1h; 09:15, 11:15, 13:15, 15:15 for 2h)
+and daily buckets at midnight IST.
+
+The reduction is one segmented pass over the bars of every symbol at once:
+bars are laid end to end sorted by (symbol, time), a new segment starts
+wherever the symbol or the bucket changes, and the ufunc reduceat calls
+compute High, Low and Volume per segment, with Open and Close taken from
+each segment's first and last bar.
+
+BarAggregator caches the aggregated bars per symbol and timeframe and only
+re-reduces from the newest cached bucket on, which may still be forming.
+The cache covers the same buckets as a rebuild from the base ring buffer,
+so the bars (and the EMA seeded from the oldest of them) do not depend on
+how long the server has been up:
+
+    aggregator = BarAggregator(universe_bars)
+    panels, counts = aggregator.panels('2h', stock_symbols)   # like indicator_engine.build_panel
+
+For frames outside the ring buffers, aggregate_frame and resample_bars do
+the same on yfinance group_by='ticker' and single-symbol frames.
+"""
+import numpy as np
+
+import bar_buffers
+import lazy_imports
+import market_calendar
+
+pd = lazy_imports.lazy_import('pandas')
+
+# Bucket width per timeframe; None is one bucket per session day
+TIMEFRAME_MINUTES = {
+    '5m': 5,
+    '15m': 15,
+    '1h': 60,
+    '2h': 120,
+    '4h': 240,
+    '1d': None,
+}
+
+# The finest base interval that covers each timeframe's history
+TIMEFRAME_BASE = {
+    '5m': '1m',
+    '15m': '1m',
+    '1h': '1m',
+    '2h': '1h',
+    '4h': '1h',
+    '1d': '1h',
+}
+
+_BASE_MINUTES = {'1m': 1, '1h': 60}
+_SESSION_MINUTES = ((market_calendar.SESSION_CLOSE[0] - market_calendar.SESSION_OPEN[0]) * 60 +
+                    market_calendar.SESSION_CLOSE[1] - market_calendar.SESSION_OPEN[1])
+
+_NS_PER_MINUTE = 60_000_000_000
+_NS_PER_DAY = 24 * 60 * _NS_PER_MINUTE
+_MARKET_OFFSET_NS = 19_800_000_000_000  # IST is UTC+05:30, no DST
+_SESSION_OPEN_NS = (market_calendar.SESSION_OPEN[0] * 60 + market_calendar.SESSION_OPEN[1]) * _NS_PER_MINUTE
+
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = (bar_buffers.BAR_FIELDS.index(field)
+                                       for field in ('Open', 'High', 'Low', 'Close', 'Volume'))
+
+
+def bucket_starts(timestamps, timeframe):
+    """Start (UTC int64 ns) of the session-aligned bucket holding each timestamp."""
+    local = timestamps + _MARKET_OFFSET_NS
+    day = local - local % _NS_PER_DAY
+    minutes = TIMEFRAME_MINUTES[timeframe]
+    if minutes is None:
+        return day - _MARKET_OFFSET_NS
+    width = minutes * _NS_PER_MINUTE
+    return day + _SESSION_OPEN_NS + (local - day - _SESSION_OPEN_NS) // width * width - _MARKET_OFFSET_NS
+
+
+def _bars_per_session(minutes):
+    return 1 if minutes is None else -(-_SESSION_MINUTES // minutes)
+
+
+def bars_from_base(timeframe, base_bars):
+    """How many timeframe bars `base_bars` bars of TIMEFRAME_BASE[timeframe] cover."""
+    sessions = base_bars / _bars_per_session(_BASE_MINUTES[TIMEFRAME_BASE[timeframe]])
+    return int(sessions * _bars_per_session(TIMEFRAME_MINUTES[timeframe]))
+
+
+def first_whole_bucket(timestamps, timeframe):
+    """
+    Index of the first sorted base bar whose bucket the bars cover from its
+    start. A bucket opens at its start, or at the session open for daily buckets.
+    """
+    lead = int(bucket_starts(timestamps[:1], timeframe)[0])
+    local = int(timestamps[0]) + _MARKET_OFFSET_NS
+    session_open = local - local % _NS_PER_DAY + _SESSION_OPEN_NS - _MARKET_OFFSET_NS
+    if timestamps[0] <= max(lead, session_open):
+        return 0
+    return int(np.searchsorted(bucket_starts(timestamps, timeframe), lead, side='right'))
+
+
+def reduce_bars(keys, timestamps, values, timeframe):
+    """
+    Aggregate bars sorted by (key, time), values shaped (BAR_FIELDS x bars).
+    Returns the key, bucket start and (BAR_FIELDS x buckets) values of every bucket.
+    """
+    if len(timestamps) == 0:
+        return keys[:0], timestamps[:0], values[:, :0]
+    buckets = bucket_starts(timestamps, timeframe)
+    boundary = np.empty(len(timestamps), dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (keys[1:] != keys[:-1]) | (buckets[1:] != buckets[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(timestamps)) - 1
+
+    out = np.empty((values.shape[0], len(starts)), dtype=values.dtype)
+    out[_OPEN] = values[_OPEN, starts]
+    out[_HIGH] = np.fmax.reduceat(values[_HIGH], starts)
+    out[_LOW] = np.fmin.reduceat(values[_LOW], starts)
+    out[_CLOSE] = values[_CLOSE, ends]
+    out[_VOLUME] = np.add.reduceat(np.nan_to_num(values[_VOLUME]), starts)
+    return keys[starts], buckets[starts], out
+
+
+def _frame_values(frame):
+    values = np.full((len(bar_buffers.BAR_FIELDS), len(frame)), np.nan)
+    for i, field in enumerate(bar_buffers.BAR_FIELDS):
+        if field in frame.columns:
+            values[i] = frame[field].to_numpy(dtype='float64')
+    return values
+
+
+def _to_frame(timestamps, values, tz):
+    index = pd.to_datetime(timestamps, unit='ns', utc=True)
+    index = index.tz_convert(tz) if tz is not None else index.tz_localize(None)
+    return pd.DataFrame({field: values[i] for i, field in enumerate(bar_buffers.BAR_FIELDS)}, index=index)
+
+
+def aggregate_frame(stock_data, timeframe):
+    """Aggregate a yfinance group_by='ticker' frame to the timeframe, in the same layout."""
+    if stock_data is None or stock_data.empty or not isinstance(stock_data.columns, pd.MultiIndex):
+        return pd.DataFrame()
+    stock_data = stock_data.sort_index()
+    timestamps = bar_buffers._to_ns(stock_data.index)
+    symbols = list(stock_data.columns.get_level_values(0).unique())
+
+    keys, stamps, rows = [], [], []
+    for key, symbol in enumerate(symbols):
+        values = _frame_values(stock_data[symbol])
+        # Rows where this symbol had no bar are other symbols' bars
+        has_bar = ~np.isnan(values[_CLOSE])
+        keys.append(np.full(int(has_bar.sum()), key))
+        stamps.append(timestamps[has_bar])
+        rows.append(values[:, has_bar])
+    keys, stamps, values = reduce_bars(np.concatenate(keys), np.concatenate(stamps), np.hstack(rows), timeframe)
+
+    tz = stock_data.index.tz
+    bounds = np.searchsorted(keys, np.arange(len(symbols) + 1))
+    frames = {symbol: _to_frame(stamps[bounds[key]:bounds[key + 1]], values[:, bounds[key]:bounds[key + 1]], tz)
+              for key, symbol in enumerate(symbols) if bounds[key + 1] > bounds[key]}
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+
+def resample_bars(data, timeframe):
+    """Aggregate one symbol's OHLCV frame to the timeframe."""
+    if isinstance(data.columns, pd.MultiIndex):
+        # A one-ticker yf.download keeps the ticker as a column level
+        field_level = 0 if 'Close' in data.columns.get_level_values(0) else 1
+        data = data.droplevel(1 - field_level, axis=1)
+    data = data.sort_index()
+    values = _frame_values(data)
+    has_bar = ~np.isnan(values[_CLOSE])
+    timestamps = bar_buffers._to_ns(data.index)[has_bar]
+    _, stamps, values = reduce_bars(np.zeros(len(timestamps), dtype=np.int64), timestamps, values[:, has_bar],
+                                    timeframe)
+    return _to_frame(stamps, values, data.index.tz)
+
+
+class BarAggregator:
+    """Cached, incrementally extended timeframes over a UniverseBars."""
+
+    def __init__(self, universe_bars):
+        self.universe_bars = universe_bars
+        self.cache = {}  # (timeframe, symbol) -> (bucket starts, values)
+
+    def update(self, timeframe, stock_symbols):
+        """Fold new base bars into the cached buckets of the symbols."""
+        base = TIMEFRAME_BASE[timeframe]
+        keys, stamps, rows, kept = [], [], [], {}
+        for key, symbol in enumerate(stock_symbols):
+            if self.universe_bars.is_empty(symbol, base):
+                self.cache.pop((timeframe, symbol), None)
+                continue
+            timestamps, values = self.universe_bars.symbols[symbol].buffers[base].ordered()
+            # A buffer that starts part-way into a bucket would make it partial, so it is left out
+            first = first_whole_bucket(timestamps, timeframe)
+            cached = self.cache.get((timeframe, symbol))
+            if cached is not None and first < len(timestamps):
+                # Buckets the base buffer has dropped go too, as a rebuild would not have them
+                window = np.searchsorted(cached[0], bucket_starts(timestamps[first:first + 1], timeframe)[0])
+                cached = (cached[0][window:], cached[1][:, window:])
+            if cached is not None and first < len(timestamps) and len(cached[0]):
+                # The newest cached bucket may still be forming, so it is rebuilt; older ones are kept
+                start = np.searchsorted(timestamps, cached[0][-1])
+                keep = len(cached[0]) - 1
+                kept[key] = (cached[0][:keep], cached[1][:, :keep])
+            else:
+                start = first
+            timestamps, values = timestamps[start:], values[:, start:]
+            keys.append(np.full(len(timestamps), key))
+            stamps.append(timestamps)
+            rows.append(values)
+        if not keys:
+            return
+
+        keys, stamps, values = reduce_bars(np.concatenate(keys), np.concatenate(stamps), np.hstack(rows), timeframe)
+        bounds = np.searchsorted(keys, np.arange(len(stock_symbols) + 1))
+        for key, symbol in enumerate(stock_symbols):
+            if self.universe_bars.is_empty(symbol, TIMEFRAME_BASE[timeframe]):
+                continue
+            fresh_stamps = stamps[bounds[key]:bounds[key + 1]]
+            fresh_values = values[:, bounds[key]:bounds[key + 1]]
+            if key in kept:
+                fresh_stamps = np.concatenate([kept[key][0], fresh_stamps])
+                fresh_values = np.hstack([kept[key][1], fresh_values])
+            self.cache[timeframe, symbol] = (fresh_stamps, fresh_values)
+
+    def bars(self, timeframe, symbol):
+        """Bucket starts and (BAR_FIELDS x buckets) values, as of the last update."""
+        return self.cache.get((timeframe, symbol))
+
+    def panels(self, timeframe, stock_symbols, fields=('Open', 'High', 'Low', 'Close')):
+        """Right-aligned (time x symbol) panels and bar counts, like indicator_engine.build_panel."""
+        self.update(timeframe, stock_symbols)
+        entries = [self.cache.get((timeframe, symbol)) for symbol in stock_symbols]
+        counts = np.array([0 if entry is None else len(entry[0]) for entry in entries], dtype=np.int64)
+        n_rows = int(counts.max()) if len(counts) else 0
+        panels = {field: np.full((n_rows, len(stock_symbols)), np.nan) for field in fields}
+        for j, entry in enumerate(entries):
+            if entry is None or counts[j] == 0:
+                continue
+            for field in fields:
+                panels[field][n_rows - counts[j]:, j] = entry[1][bar_buffers.BAR_FIELDS.index(field)]
+        return panels, counts
+
+    def frame(self, timeframe, stock_symbols):
+        """The aggregated bars as a group_by='ticker' frame indexed in market time."""
+        self.update(timeframe, stock_symbols)
+        frames = {}
+        for symbol in stock_symbols:
+            entry = self.cache.get((timeframe, symbol))
+            if entry is not None and len(entry[0]):
+                frames[symbol] = _to_frame(entry[0], entry[1], bar_buffers.MARKET_TZ)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def drop(self, symbol):
+        for timeframe in TIMEFRAME_MINUTES:
+            self.cache.pop((timeframe, symbol), None)
@@ -0,0 +1,238 @@
+"""
+Bounded, preallocated per-symbol bar storage.
+
+Each symbol keeps one fixed-capacity ring buffer per interval, sized to
+what the indicators read, so memory stays flat over weeks of uptime. New
+bars are written in place, a re-sent bar with the same timestamp (the one
+that was still forming) overwrites the last slot, and the aligned
+(time x symbol) panels for the indicator engine are filled into arrays
+that are reused from cycle to cycle.
+"""
+import numpy as np
+
+import lazy_imports
+
+pd = lazy_imports.lazy_import('pandas')
+
+# float32 halves the footprint; float64 keeps results identical to the DataFrame path
+BAR_DTYPE = np.float64
+
+BAR_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+BAR_CAPACITY = {
+    # The 120-bar EMA is SMA-seeded at the start of the window, so the ring
+    # is trimmed to the same 3 months of hours the frames path keeps (see
+    # UniverseBars.drop_before); 480 is room for the longest such window
+    '1h': 480,
+    '1d': 253,   # 252 trading days back plus today
+    '1m': 375,   # one NSE session, 09:15-15:29
+}
+
+MARKET_TZ = 'Asia/Kolkata'
+_NS_PER_DAY = 86_400_000_000_000
+_MARKET_OFFSET_NS = 19_800_000_000_000  # IST is UTC+05:30, no DST
+
+
+def _to_ns(index):
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[ns]').astype('int64')
+
+
+class BarRingBuffer:
+    __slots__ = ('capacity', 'timestamps', 'values', 'size', 'head')
+
+    def __init__(self, capacity, dtype=BAR_DTYPE):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((len(BAR_FIELDS), capacity), np.nan, dtype=dtype)
+        self.size = 0
+        self.head = 0  # slot the next bar goes into
+
+    def clear(self):
+        self.size = 0
+        self.head = 0
+
+    def last_timestamp(self):
+        if self.size == 0:
+            return None
+        return int(self.timestamps[self.head - 1])
+
+    def append(self, timestamp, row):
+        last = self.last_timestamp()
+        if last is not None and timestamp < last:
+            return
+        if last is not None and timestamp == last:
+            slot = self.head - 1
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        self.timestamps[slot] = timestamp
+        self.values[:, slot] = row
+
+    def extend(self, timestamps, rows):
+        """Append bars given as a sorted int64 ns array and a (fields x bars) array."""
+        last = self.last_timestamp()
+        if last is not None:
+            keep = timestamps >= last
+            timestamps = timestamps[keep]
+            rows = rows[:, keep]
+            if len(timestamps) and timestamps[0] == last:
+                self.values[:, self.head - 1] = rows[:, 0]
+                timestamps = timestamps[1:]
+                rows = rows[:, 1:]
+        if len(timestamps) > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            rows = rows[:, -self.capacity:]
+        n_bars = len(timestamps)
+        if n_bars == 0:
+            return
+        slots = (self.head + np.arange(n_bars)) % self.capacity
+        self.timestamps[slots] = timestamps
+        self.values[:, slots] = rows
+        self.head = (self.head + n_bars) % self.capacity
+        self.size = min(self.size + n_bars, self.capacity)
+
+    def drop_before(self, timestamp):
+        """Forget the bars older than `timestamp` (int64 ns)."""
+        if self.size:
+            self.size -= int(np.count_nonzero(self.ordered_timestamps() < timestamp))
+
+    def copy_into(self, field_index, out):
+        """Write one field oldest-first into the bottom of `out`, NaN above."""
+        out[:out.shape[0] - self.size] = np.nan
+        if self.size == 0:
+            return
+        start = (self.head - self.size) % self.capacity
+        first = min(self.size, self.capacity - start)
+        top = out.shape[0] - self.size
+        out[top:top + first] = self.values[field_index, start:start + first]
+        out[top + first:] = self.values[field_index, :self.size - first]
+
+    def ordered_timestamps(self):
+        start = (self.head - self.size) % self.capacity
+        return np.roll(self.timestamps, -start)[:self.size]
+
+    def ordered(self):
+        """Timestamps and (fields x bars) values, oldest first."""
+        slots = (self.head - self.size + np.arange(self.size)) % self.capacity
+        return self.timestamps[slots], self.values[:, slots]
+
+
+class SymbolBars:
+    __slots__ = ('buffers',)
+
+    def __init__(self, dtype=BAR_DTYPE):
+        self.buffers = {interval: BarRingBuffer(capacity, dtype) for interval, capacity in BAR_CAPACITY.items()}
+
+
+class UniverseBars:
+    def __init__(self, dtype=BAR_DTYPE):
+        self.dtype = dtype
+        self.symbols = {}
+        self._panels = {}
+
+    def bars(self, symbol):
+        if symbol not in self.symbols:
+            self.symbols[symbol] = SymbolBars(self.dtype)
+        return self.symbols[symbol]
+
+    def drop(self, symbol):
+        self.symbols.pop(symbol, None)
+
+    def is_empty(self, symbol, interval):
+        return symbol not in self.symbols or self.symbols[symbol].buffers[interval].size == 0
+
+    def ingest(self, interval, stock_data):
+        """Push the bars of a group_by='ticker' frame into the buffers."""
+        if stock_data is None or stock_data.empty or not isinstance(stock_data.columns, pd.MultiIndex):
+            return
+        timestamps = _to_ns(stock_data.index)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        for symbol in stock_data.columns.get_level_values(0).unique():
+            frame = stock_data[symbol]
+            rows = np.full((len(BAR_FIELDS), len(timestamps)), np.nan)
+            for i, field in enumerate(BAR_FIELDS):
+                if field in frame.columns:
+                    rows[i] = frame[field].to_numpy(dtype='float64')[order]
+            has_bar = ~np.isnan(rows[BAR_FIELDS.index('Close')])
+            if has_bar.any():
+                self.bars(symbol).buffers[interval].extend(timestamps[has_bar], rows[:, has_bar])
+
+    def drop_before(self, interval, timestamp, stock_symbols):
+        for symbol in stock_symbols:
+            if symbol in self.symbols:
+                self.symbols[symbol].buffers[interval].drop_before(timestamp)
+
+    def _panel(self, interval, field, n_symbols):
+        key = (interval, field)
+        panel = self._panels.get(key)
+        if panel is None or panel.shape[1] != n_symbols:
+            panel = self._panels[key] = np.empty((BAR_CAPACITY[interval], n_symbols), dtype=self.dtype)
+        return panel
+
+    def fill_panel(self, interval, field, stock_symbols):
+        panel = self._panel(interval, field, len(stock_symbols))
+        field_index = BAR_FIELDS.index(field)
+        for j, symbol in enumerate(stock_symbols):
+            if symbol in self.symbols:
+                self.symbols[symbol].buffers[interval].copy_into(field_index, panel[:, j])
+            else:
+                panel[:, j] = np.nan
+        return panel
+
+    def counts(self, interval, stock_symbols):
+        return np.array([0 if symbol not in self.symbols else self.symbols[symbol].buffers[interval].size
+                         for symbol in stock_symbols], dtype=np.int64)
+
+    def panels(self, stock_symbols):
+        """The arrays indicator_engine.results_from_panels expects, in symbol order."""
+        high_1m = self.fill_panel('1m', 'High', stock_symbols)
+        low_1m = self.fill_panel('1m', 'Low', stock_symbols)
+
+        # Day High/Low only look at the latest session in each minute buffer
+        n_symbols = len(stock_symbols)
+        day_high = np.full(n_symbols, np.nan)
+        day_low = np.full(n_symbols, np.nan)
+        for j, symbol in enumerate(stock_symbols):
+            if self.is_empty(symbol, '1m'):
+                continue
+            buffer = self.symbols[symbol].buffers['1m']
+            days = (buffer.ordered_timestamps() + _MARKET_OFFSET_NS) // _NS_PER_DAY
+            today = days == days[-1]
+            day_high[j] = np.nanmax(high_1m[-buffer.size:, j][today])
+            day_low[j] = np.nanmin(low_1m[-buffer.size:, j][today])
+
+        return {
+            'open_1h': self.fill_panel('1h', 'Open', stock_symbols),
+            'high_1h': self.fill_panel('1h', 'High', stock_symbols),
+            'low_1h': self.fill_panel('1h', 'Low', stock_symbols),
+            'close_1h': self.fill_panel('1h', 'Close', stock_symbols),
+            'count_1h': self.counts('1h', stock_symbols),
+            'high_1d': self.fill_panel('1d', 'High', stock_symbols),
+            'low_1d': self.fill_panel('1d', 'Low', stock_symbols),
+            'close_1d': self.fill_panel('1d', 'Close', stock_symbols),
+            'count_1d': self.counts('1d', stock_symbols),
+            'day_high': day_high,
+            'day_low': day_low,
+        }
+
+    def frame(self, interval, stock_symbols):
+        """Rebuild a group_by='ticker' frame, for code that still wants DataFrames."""
+        frames = {}
+        for symbol in stock_symbols:
+            if self.is_empty(symbol, interval):
+                continue
+            buffer = self.symbols[symbol].buffers[interval]
+            index = pd.to_datetime(buffer.ordered_timestamps(), unit='ns', utc=True).tz_convert(MARKET_TZ)
+            columns = {}
+            for i, field in enumerate(BAR_FIELDS):
+                column = np.empty(buffer.capacity, dtype=self.dtype)
+                buffer.copy_into(i, column)
+                columns[field] = column[-buffer.size:].astype('float64')
+            frames[symbol] = pd.DataFrame(columns, index=index)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
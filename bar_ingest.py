@@ -0,0 +1,375 @@
+"""
+Streaming minute-bar ingestion.
+
+A bar source yields MinuteBar records as they arrive. The ingestor pushes
+each one into the symbol's ring buffers and into its IntradayState, which
+keeps the day's high and low, the current value and the forming hourly bar
+up to date one bar at a time. Nothing re-downloads the session.
+
+Sources, picked with a URL-like string (see source_from_url):
+
+    file:data/minute_bars.jsonl     JSON lines appended to a local file (tail -f)
+    socket:127.0.0.1:9009           JSON lines from a TCP feed
+    poll                            yfinance 1m downloads starting at the last bar seen
+
+Each JSON line looks like
+
+    {"symbol": "INFY.NS", "time": "2026-10-16T10:15:00+05:30",
+     "open": 1890.1, "high": 1891.0, "low": 1889.6, "close": 1890.5, "volume": 1200}
+
+where time is the bar's start, as an ISO string or epoch seconds.
+"""
+import abc
+import json
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import bar_buffers
+import fetch_executor
+import lazy_imports
+import market_calendar
+
+pd = lazy_imports.lazy_import('pandas')
+
+MinuteBar = namedtuple('MinuteBar', 'symbol timestamp open high low close volume')
+
+_NS_PER_MINUTE = 60_000_000_000
+_NS_PER_HOUR = 60 * _NS_PER_MINUTE
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+_MARKET_OFFSET_NS = 19_800_000_000_000  # IST is UTC+05:30, no DST
+# Hourly bars start on the session open, 09:15, 10:15, ... like yfinance's
+_HOUR_ORIGIN_NS = (market_calendar.SESSION_OPEN[0] * 60 + market_calendar.SESSION_OPEN[1]) * _NS_PER_MINUTE
+
+SOURCE_POLL_SECONDS = 1
+SOCKET_RECONNECT_SECONDS = 5
+YFINANCE_POLL_SECONDS = 20
+
+
+def _timestamp_ns(value):
+    if isinstance(value, (int, float)):
+        return int(value * 1_000_000_000)
+    stamp = pd.Timestamp(value)
+    if stamp.tz is None:
+        stamp = stamp.tz_localize(market_calendar.MARKET_TZ)
+    return stamp.value
+
+
+def parse_bar(record):
+    return MinuteBar(record['symbol'], _timestamp_ns(record['time']), float(record['open']),
+                     float(record['high']), float(record['low']), float(record['close']),
+                     float(record.get('volume', 0.0)))
+
+
+def hour_start(timestamp):
+    """Start of the session-aligned hourly bar holding this minute."""
+    local = timestamp + _MARKET_OFFSET_NS
+    day = local - local % _NS_PER_DAY
+    return day + _HOUR_ORIGIN_NS + (local - day - _HOUR_ORIGIN_NS) // _NS_PER_HOUR * _NS_PER_HOUR - _MARKET_OFFSET_NS
+
+
+def session_day(timestamp):
+    return (timestamp + _MARKET_OFFSET_NS) // _NS_PER_DAY
+
+
+class IntradayState:
+    __slots__ = ('day', 'day_high', 'day_low', 'value', 'last_timestamp', 'minute_volume',
+                 'hour_timestamp', 'hour_open', 'hour_high', 'hour_low', 'hour_close', 'hour_volume',
+                 'hour_complete')
+
+    def __init__(self):
+        self.day = None
+        self.last_timestamp = None
+        self.minute_volume = 0.0
+        self.hour_timestamp = None
+        self.hour_complete = False
+
+    def seed_hour(self, hour, values, complete):
+        """
+        Start the forming hour from minute bars already held for it, as a
+        (BAR_FIELDS x bars) array, oldest first; complete says whether they
+        include the hour's first minute.
+        """
+        self.hour_timestamp = hour
+        self.hour_open = values[0, 0]
+        self.hour_high = np.nanmax(values[1])
+        self.hour_low = np.nanmin(values[2])
+        self.hour_close = values[3, -1]
+        self.hour_volume = float(np.nansum(values[4]))
+        self.hour_complete = complete
+
+    def update(self, bar):
+        """Fold one minute bar in; returns False for bars older than the last one."""
+        if self.last_timestamp is not None and bar.timestamp < self.last_timestamp:
+            return False
+        resent = bar.timestamp == self.last_timestamp
+        day = session_day(bar.timestamp)
+        if day != self.day:
+            self.day = day
+            self.day_high = bar.high
+            self.day_low = bar.low
+        else:
+            self.day_high = max(self.day_high, bar.high)
+            self.day_low = min(self.day_low, bar.low)
+        self.value = bar.close
+        self.last_timestamp = bar.timestamp
+
+        hour = hour_start(bar.timestamp)
+        if hour != self.hour_timestamp:
+            self.hour_timestamp = hour
+            self.hour_open = bar.open
+            self.hour_high = bar.high
+            self.hour_low = bar.low
+            self.hour_volume = bar.volume
+            self.hour_complete = bar.timestamp == hour
+        else:
+            self.hour_high = max(self.hour_high, bar.high)
+            self.hour_low = min(self.hour_low, bar.low)
+            # A minute that is re-sent while it forms replaces its earlier volume
+            self.hour_volume += bar.volume - (self.minute_volume if resent else 0.0)
+        self.minute_volume = bar.volume
+        self.hour_close = bar.close
+        return True
+
+    def hour_row(self):
+        return (self.hour_open, self.hour_high, self.hour_low, self.hour_close, self.hour_volume)
+
+
+class BarIngestor:
+    """Feeds bars from a source into UniverseBars and per-symbol IntradayState."""
+
+    def __init__(self, universe_bars, lock, symbols=None):
+        self.universe_bars = universe_bars
+        self.lock = lock
+        # Callable returning the watched symbols; bars for anything else are dropped.
+        # A changed watch list is a new list, so the set is only rebuilt when it changes.
+        self.symbols = symbols
+        self._watched = (None, frozenset())
+        self.states = {}
+        self.bars_ingested = 0
+        self._stop = threading.Event()
+
+    def watched(self):
+        symbols = self.symbols()
+        if symbols is not self._watched[0]:
+            self._watched = (symbols, frozenset(symbols))
+        return self._watched[1]
+
+    def ingest(self, bar):
+        if self.symbols is not None and bar.symbol not in self.watched():
+            return False
+        with self.lock:
+            state = self.states.get(bar.symbol)
+            if state is None:
+                state = self.states[bar.symbol] = IntradayState()
+            buffers = self.universe_bars.bars(bar.symbol).buffers
+            hour = hour_start(bar.timestamp)
+            if hour != state.hour_timestamp and bar.timestamp > hour and \
+                    (state.last_timestamp is None or bar.timestamp > state.last_timestamp):
+                # Joined the hour part-way: start from the minutes already downloaded for it
+                self._seed_hour(state, buffers['1m'], hour, bar.timestamp)
+            if not state.update(bar):
+                return False
+            buffers['1m'].append(bar.timestamp, (bar.open, bar.high, bar.low, bar.close, bar.volume))
+            # The forming hourly bar overwrites its own slot until the next hour starts. An
+            # hour not seen from its first minute would replace the downloaded bar with a
+            # partial one, so that bar is left for the hourly downloads to update.
+            if state.hour_complete:
+                buffers['1h'].append(state.hour_timestamp, state.hour_row())
+            self.bars_ingested += 1
+        return True
+
+    @staticmethod
+    def _seed_hour(state, minutes, hour, timestamp):
+        timestamps, values = minutes.ordered()
+        held = (timestamps >= hour) & (timestamps < timestamp)
+        if held.any():
+            state.seed_hour(hour, values[:, held], complete=timestamps[held][0] == hour)
+
+    def intraday(self, stock_symbols):
+        """Today's high, low and latest close per symbol, NaN where no bar arrived today."""
+        day_high = np.full(len(stock_symbols), np.nan)
+        day_low = np.full(len(stock_symbols), np.nan)
+        value = np.full(len(stock_symbols), np.nan)
+        today = session_day(pd.Timestamp.now(tz='UTC').value)
+        for i, symbol in enumerate(stock_symbols):
+            state = self.states.get(symbol)
+            if state is not None and state.day == today:
+                day_high[i] = state.day_high
+                day_low[i] = state.day_low
+                value[i] = state.value
+        return day_high, day_low, value
+
+    def drop(self, symbol):
+        self.states.pop(symbol, None)
+
+    def run(self, source):
+        # Parsing and ingesting need pandas, which may still be loading at startup
+        lazy_imports.wait_for_preload()
+        try:
+            for bar in source:
+                if self._stop.is_set():
+                    break
+                try:
+                    self.ingest(bar)
+                except Exception as e:
+                    print(f"Error ingesting bar {bar}: {e}")
+        finally:
+            source.close()
+
+    def start(self, source):
+        thread = threading.Thread(target=self.run, args=(source,), daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+class BarSource(abc.ABC):
+    """Iterable of MinuteBar; iteration blocks until bars arrive."""
+
+    @abc.abstractmethod
+    def __iter__(self):
+        ...
+
+    def close(self):
+        pass
+
+
+class FileBarSource(BarSource):
+    def __init__(self, path, follow=True, poll_seconds=SOURCE_POLL_SECONDS):
+        self.path = path
+        self.follow = follow
+        self.poll_seconds = poll_seconds
+        self._closed = False
+
+    def __iter__(self):
+        while not os.path.exists(self.path):
+            if not self.follow or self._closed:
+                return
+            time.sleep(self.poll_seconds)
+        with open(self.path) as f:
+            pending = ''
+            while not self._closed:
+                line = f.readline()
+                if not line:
+                    if not self.follow:
+                        return
+                    time.sleep(self.poll_seconds)
+                    continue
+                pending += line
+                # A line still being written has no newline yet
+                if not pending.endswith('\n'):
+                    continue
+                record, pending = pending.strip(), ''
+                if not record:
+                    continue
+                try:
+                    yield parse_bar(json.loads(record))
+                except (ValueError, KeyError) as e:
+                    print(f"Error parsing bar line {record!r}: {e}")
+
+    def close(self):
+        self._closed = True
+
+
+class SocketBarSource(BarSource):
+    def __init__(self, host, port, reconnect_seconds=SOCKET_RECONNECT_SECONDS):
+        self.host = host
+        self.port = port
+        self.reconnect_seconds = reconnect_seconds
+        self._closed = False
+        self._socket = None
+
+    def __iter__(self):
+        while not self._closed:
+            try:
+                self._socket = socket.create_connection((self.host, self.port))
+                with self._socket.makefile('r') as lines:
+                    for line in lines:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            yield parse_bar(json.loads(line))
+                        except (ValueError, KeyError) as e:
+                            print(f"Error parsing bar line {line!r}: {e}")
+            except OSError as e:
+                if self._closed:
+                    return
+                print(f"Bar feed {self.host}:{self.port} unavailable: {e}")
+            if not self._closed:
+                time.sleep(self.reconnect_seconds)
+
+    def close(self):
+        self._closed = True
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+
+
+class YFinancePollingSource(BarSource):
+    """Downloads only the minute bars after the last one seen for each symbol."""
+
+    def __init__(self, symbols, poll_seconds=YFINANCE_POLL_SECONDS):
+        self.symbols = symbols
+        self.poll_seconds = poll_seconds
+        self.last_seen = {}
+        self._closed = False
+
+    def _poll(self):
+        stock_symbols = list(self.symbols())
+        if not stock_symbols:
+            return []
+        # Start from the oldest last bar so every symbol's gap is covered
+        known = [self.last_seen.get(symbol) for symbol in stock_symbols]
+        # Through fetch_executor, so polls share the rate limit and request slots with the cycles
+        if any(ts is None for ts in known):
+            data = fetch_executor.download(stock_symbols, period='1d', interval='1m')
+        else:
+            data = fetch_executor.download(stock_symbols, start=int(min(known) // 1_000_000_000), interval='1m')
+        if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return []
+        timestamps = bar_buffers._to_ns(data.index)
+        bars = []
+        for symbol in data.columns.get_level_values(0).unique():
+            frame = data[symbol]
+            last = self.last_seen.get(symbol)
+            for ts, row in zip(timestamps, frame[list(bar_buffers.BAR_FIELDS)].to_numpy(dtype='float64')):
+                # The newest bar is re-sent while it forms, so >= rather than >
+                if np.isnan(row[3]) or (last is not None and ts < last):
+                    continue
+                bars.append(MinuteBar(symbol, int(ts), *row))
+                self.last_seen[symbol] = int(ts)
+        bars.sort(key=lambda bar: bar.timestamp)
+        return bars
+
+    def __iter__(self):
+        while not self._closed:
+            try:
+                yield from self._poll()
+            except Exception as e:
+                print(f"Error polling minute bars: {e}")
+            time.sleep(self.poll_seconds)
+
+    def close(self):
+        self._closed = True
+
+
+def source_from_url(url, symbols):
+    kind, _, target = url.partition(':')
+    if kind == 'file':
+        return FileBarSource(target)
+    if kind == 'socket':
+        host, _, port = target.rpartition(':')
+        return SocketBarSource(host, int(port))
+    if kind == 'poll':
+        return YFinancePollingSource(symbols)
+    raise ValueError(f"Unknown minute bar source {url!r}")
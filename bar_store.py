@@ -0,0 +1,189 @@
+"""
+On-disk columnar bar store keyed by symbol and interval.
+
+Each (symbol, interval) pair is kept in its own .npz file with one array
+per column (timestamps plus OHLCV), so a cycle only downloads the bars
+newer than the last stored timestamp and merges them in. Downloads go
+through fetch_executor, so they are chunked, rate limited and retried.
+"""
+import os
+from datetime import timedelta
+from urllib.parse import quote
+
+import numpy as np
+
+import fetch_executor
+import lazy_imports
+
+pd = lazy_imports.lazy_import('pandas')
+
+BAR_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bars')
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# How far back each yfinance period reaches (pd.DateOffset arguments), used to trim the stored history
+PERIOD_OFFSETS = {
+    '5d': {'days': 5},
+    '1mo': {'months': 1},
+    '3mo': {'months': 3},
+    '6mo': {'months': 6},
+    '1y': {'years': 1},
+    '2y': {'years': 2},
+    '5y': {'years': 5},
+}
+
+# Oldest 'start' yfinance accepts per interval; older stores are re-downloaded in full
+MAX_LOOKBACK = {
+    '1m': timedelta(days=7),
+    '2m': timedelta(days=60),
+    '5m': timedelta(days=60),
+    '15m': timedelta(days=60),
+    '30m': timedelta(days=60),
+    '1h': timedelta(days=730),
+}
+
+
+def _bar_path(symbol, interval, store_dir):
+    # Symbols such as '^NSEI' and 'M&M.NS' are quoted to stay filesystem safe
+    return os.path.join(store_dir or BAR_STORE_DIR, interval, quote(symbol, safe='') + '.npz')
+
+
+def load_bars(symbol, interval, store_dir=None):
+    path = _bar_path(symbol, interval, store_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            index = pd.to_datetime(stored['index'], unit='ns', utc=True)
+            tz = str(stored['tz'])
+            index = index.tz_convert(tz) if tz else index.tz_localize(None)
+            columns = [c for c in BAR_COLUMNS if c in stored.files]
+            return pd.DataFrame({c: stored[c] for c in columns}, index=index)
+    except Exception as e:
+        print(f"Error loading stored bars for {symbol} ({interval}): {e}")
+        return pd.DataFrame()
+
+
+def save_bars(symbol, interval, bars, store_dir=None):
+    path = _bar_path(symbol, interval, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    index = bars.index
+    tz = str(index.tz) if index.tz is not None else ''
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    timestamps = index.values.astype('datetime64[ns]').astype('int64')
+    columns = {c: bars[c].to_numpy(dtype='float64') for c in BAR_COLUMNS if c in bars.columns}
+
+    # Write to a temporary file first so a crash never leaves a torn store
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, index=timestamps, tz=np.array(tz), **columns)
+    os.replace(tmp_path, path)
+
+
+def _symbol_frame(downloaded, symbol):
+    if downloaded is None or downloaded.empty:
+        return pd.DataFrame()
+    if isinstance(downloaded.columns, pd.MultiIndex):
+        if symbol not in downloaded.columns.get_level_values(0):
+            return pd.DataFrame()
+        frame = downloaded[symbol]
+    else:
+        # Older yfinance versions return flat columns for a single ticker
+        frame = downloaded
+    return frame.dropna(how='all')
+
+
+def period_start(period, tz):
+    """Oldest bar time a period keeps as of now, or None when it is not a fixed look-back."""
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return None
+    return pd.Timestamp.now(tz=tz) - pd.DateOffset(**offset)
+
+
+def _trim_to_period(bars, period):
+    if bars.empty:
+        return bars
+    if period == '1d':
+        # yfinance's 1d period is the latest session, not the last 24 hours
+        session_dates = bars.index.normalize()
+        return bars[session_dates == session_dates[-1]]
+    start = period_start(period, bars.index.tz)
+    if start is None:
+        return bars
+    return bars[bars.index >= start]
+
+
+def merge_bars(stored, fresh):
+    if stored.empty:
+        return fresh.sort_index()
+    if fresh.empty:
+        return stored
+    # Fresh bars win so the previously forming bar is replaced by its final values
+    merged = pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged.sort_index()
+
+
+def update_bars(stock_symbols, period, interval, store_dir=None, tail_only=False):
+    """
+    Bring the store up to date for the symbols and return the requested
+    period in yfinance's group_by='ticker' layout, or with tail_only just
+    the bars that were downloaded.
+    """
+    stored = {symbol: load_bars(symbol, interval, store_dir) for symbol in stock_symbols}
+
+    lookback = MAX_LOOKBACK.get(interval)
+    now = pd.Timestamp.now(tz='UTC')
+    full_symbols = []
+    tail_symbols = []
+    tail_start = None
+    for symbol, bars in stored.items():
+        if bars.empty:
+            full_symbols.append(symbol)
+            continue
+        last_ts = bars.index[-1]
+        last_utc = last_ts.tz_convert('UTC') if last_ts.tzinfo else last_ts.tz_localize('UTC')
+        if lookback is not None and last_utc < now - lookback:
+            full_symbols.append(symbol)
+            continue
+        tail_symbols.append(symbol)
+        tail_start = last_utc if tail_start is None else min(tail_start, last_utc)
+
+    downloads = []
+    if full_symbols:
+        downloads.append((full_symbols, fetch_executor.download(full_symbols, period=period, interval=interval)))
+    if tail_symbols:
+        # Only bars from the last stored timestamp onwards are requested
+        downloads.append((tail_symbols, fetch_executor.download(tail_symbols, start=int(tail_start.timestamp()),
+                                                                interval=interval)))
+
+    downloaded_bars = {}
+    for symbols, downloaded in downloads:
+        for symbol in symbols:
+            fresh = _symbol_frame(downloaded, symbol)
+            if fresh.empty:
+                continue
+            merged = _trim_to_period(merge_bars(stored[symbol], fresh), period)
+            save_bars(symbol, interval, merged, store_dir)
+            stored[symbol] = merged
+            downloaded_bars[symbol] = fresh
+
+    if tail_only:
+        return assemble_frame(stock_symbols, downloaded_bars)
+    return assemble_frame(stock_symbols, {s: _trim_to_period(b, period) for s, b in stored.items()})
+
+
+def read_bars(stock_symbols, period, interval, store_dir=None):
+    """Stored bars only, without touching the network."""
+    bars = {symbol: _trim_to_period(load_bars(symbol, interval, store_dir), period) for symbol in stock_symbols}
+    return assemble_frame(stock_symbols, bars)
+
+
+def assemble_frame(stock_symbols, bars_by_symbol):
+    frames = {symbol: bars_by_symbol[symbol] for symbol in stock_symbols
+              if symbol in bars_by_symbol and not bars_by_symbol[symbol].empty}
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import the
+server, serve the page, and start a process-pool worker.
+
+Every sample runs in a new Python process, so nothing is cached between
+them apart from the OS page cache. The heaviest modules of one
+`python -X importtime -c "import app"` run are listed as well.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 10 --max-seconds 0.5   # exits 1 when import app is slower
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+STAGES = {
+    'interpreter': 'pass',
+    'import app': 'import app',
+    'import app + GET /': 'import app; app.app.test_client().get("/")',
+    'import app + preload': 'import app, lazy_imports; lazy_imports.preload(app.PRELOAD_MODULES).join()',
+    'worker import (sharded_engine)': 'import sharded_engine',
+}
+
+
+def _run(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def heaviest_imports(target='app', top=15):
+    """(cumulative seconds, module) of the slowest top-level imports, from -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Two spaces per nesting level; only the target's direct imports are listed,
+        # since nested ones are already in their parent's cumulative time
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import times.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float,
+                        help="fail when the median 'import app' time, minus the interpreter's, is above this")
+    args = parser.parse_args()
+
+    medians = {}
+    for stage, code in STAGES.items():
+        timings = [_run(code) for _ in range(args.repeat)]
+        medians[stage] = statistics.median(timings)
+        print(f"{stage:<32} median {medians[stage] * 1000:8.1f} ms   min {min(timings) * 1000:8.1f} ms")
+
+    print("\nHeaviest imports under app:")
+    for seconds, name in heaviest_imports():
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    import_cost = medians['import app'] - medians['interpreter']
+    if args.max_seconds is not None and import_cost > args.max_seconds:
+        print(f"\nimport app takes {import_cost:.3f}s, above the {args.max_seconds:.3f}s budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Offline benchmarks for the alert pipeline.
+
+yf.Ticker is replaced by a synthetic market and the bar store points at
+a temporary directory, so nothing touches the network; fetch_executor's
+rate limiter is switched off, since it only paces the real Yahoo requests. Each stage is timed
+separately for every (symbols, hourly bars) combination and the run is
+appended to results.jsonl, tagged with the current git commit. The file is
+git-ignored: its numbers only compare against runs on the same machine.
+
+check_and_emit_alerts is timed once per ALERT_EMIT_MODE, with one Socket.IO
+test client connected so the frames are actually encoded and queued.
+
+    python benchmarks/bench_pipeline.py --symbols 10 75 230 --hourly-bars 441 882
+    python benchmarks/bench_pipeline.py --compare <commit>   # exits 1 on regressions
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import yfinance as yf
+
+import app
+import bar_store
+import fetch_executor
+import state_store
+from synthetic_ohlcv import SyntheticMarket
+
+RESULTS_FILE = os.path.join(BENCH_DIR, 'results.jsonl')
+
+# A stage is a regression when its median grows by more than this fraction
+REGRESSION_THRESHOLD = 0.20
+
+
+class _NoRateLimit:
+    def acquire(self):
+        pass
+
+
+def _time(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        # The pipeline prints per-symbol diagnostics; keep them out of the numbers
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_case(n_symbols, hourly_bars, repeat):
+    symbols = [f'SYN{i:03d}.NS' for i in range(n_symbols)]
+    market = SyntheticMarket(bars={'1h': hourly_bars})
+    timings = {}
+
+    original_ticker = yf.Ticker
+    original_rate_limiter = fetch_executor.rate_limiter
+    original_store_dir = bar_store.BAR_STORE_DIR
+    store_dir = tempfile.mkdtemp(prefix='bench_bars_')
+    try:
+        yf.Ticker = market.ticker
+        fetch_executor.rate_limiter = _NoRateLimit()
+        bar_store.BAR_STORE_DIR = store_dir
+
+        def clear_store():
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+        # Cold store downloads everything, warm store only merges the tail
+        timings['fetch_stock_data (cold store)'] = _time(lambda: app.fetch_stock_data(symbols), repeat,
+                                                         setup=clear_store)
+        timings['fetch_stock_data (warm store)'] = _time(lambda: app.fetch_stock_data(symbols), repeat)
+        # Ring buffers only ingest what the tail download returned
+        app.universe_bars.symbols.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.fetch_into_buffers(symbols)
+        timings['fetch_into_buffers (warm)'] = _time(lambda: app.fetch_into_buffers(symbols), repeat)
+        timings['process_buffers (panel)'] = _time(lambda: app.process_buffers(symbols), repeat)
+
+        data_1h = market.download(symbols, interval='1h')
+        data_daily = market.download(symbols, interval='1d')
+        data_minute = market.download(symbols, interval='1m')
+
+        original_engine = app.INDICATOR_ENGINE
+        try:
+            for engine in ('per_symbol', 'panel', 'sharded'):
+                app.INDICATOR_ENGINE = engine
+                timings[f'process_stock_data ({engine})'] = _time(
+                    lambda: app.process_stock_data(data_1h, data_daily, data_minute, symbols), repeat)
+
+            app.INDICATOR_ENGINE = 'streaming'
+            timings['process_stock_data (streaming, cold)'] = _time(
+                lambda: app.process_stock_data(data_1h, data_daily, data_minute, symbols), repeat,
+                setup=app.indicator_states.clear)
+            timings['process_stock_data (streaming, warm)'] = _time(
+                lambda: app.process_stock_data(data_1h, data_daily, data_minute, symbols), repeat)
+        finally:
+            app.INDICATOR_ENGINE = original_engine
+            app.indicator_states.clear()
+
+        def one_call_per_symbol():
+            for symbol in symbols:
+                app.calculate_bollinger_and_rsi(data_1h[symbol], data_daily[symbol], data_minute[symbol])
+        # Reported per call so it stays comparable across universe sizes
+        timings['calculate_bollinger_and_rsi (per call)'] = [
+            t / n_symbols for t in _time(one_call_per_symbol, repeat)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = app.process_stock_data(data_1h, data_daily, data_minute, symbols)
+        timings.update(bench_emit(results, repeat))
+    finally:
+        yf.Ticker = original_ticker
+        fetch_executor.rate_limiter = original_rate_limiter
+        bar_store.BAR_STORE_DIR = original_store_dir
+        app.universe_bars.symbols.clear()
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    return [{
+        'stage': stage,
+        'symbols': n_symbols,
+        'hourly_bars': hourly_bars,
+        'median': statistics.median(values),
+        'min': min(values),
+        'repeat': repeat,
+    } for stage, values in timings.items()]
+
+
+def bench_emit(results, repeat):
+    timings = {}
+    original_mode, original_state = app.ALERT_EMIT_MODE, app.alert_state
+    client = app.socketio.test_client(app.app)
+    try:
+        for mode in ('state', 'batched', 'per_alert'):
+            app.ALERT_EMIT_MODE = mode
+
+            def reset():
+                client.get_received()
+                # An empty store, so each state-mode repeat sends the whole cycle, not an empty delta
+                app.alert_state = state_store.StateStore()
+
+            timings[f'check_and_emit_alerts ({mode}, 1 client)'] = _time(
+                lambda: app.check_and_emit_alerts(results, '10:15 AM'), repeat, setup=reset)
+    finally:
+        client.disconnect()
+        app.ALERT_EMIT_MODE, app.alert_state = original_mode, original_state
+    return timings
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def load_runs(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(run, baseline):
+    """Print stage-by-stage ratios and return the cases that regressed."""
+    previous = {(c['stage'], c['symbols'], c['hourly_bars']): c for c in baseline['cases']}
+    regressions = []
+    print(f"\nComparing {run['commit']} against {baseline['commit']} ({baseline['timestamp']})")
+    for case in run['cases']:
+        key = (case['stage'], case['symbols'], case['hourly_bars'])
+        if key not in previous:
+            continue
+        ratio = case['median'] / previous[key]['median'] if previous[key]['median'] else float('inf')
+        flag = ''
+        if ratio > 1 + REGRESSION_THRESHOLD:
+            flag = '  <-- regression'
+            regressions.append(case)
+        print(f"{case['stage']:<44} {case['symbols']:>5} sym {case['hourly_bars']:>5} bars "
+              f"{previous[key]['median'] * 1000:>10.2f} ms -> {case['median'] * 1000:>10.2f} ms "
+              f"({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the alert pipeline on synthetic data.")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[10, 75, 230])
+    parser.add_argument('--hourly-bars', type=int, nargs='+', default=[441])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compare', metavar='COMMIT',
+                        help="compare against the latest stored run of this commit")
+    parser.add_argument('--no-save', action='store_true', help="do not append this run to results.jsonl")
+    args = parser.parse_args()
+
+    cases = []
+    for n_symbols in args.symbols:
+        for hourly_bars in args.hourly_bars:
+            print(f"Benchmarking {n_symbols} symbols x {hourly_bars} hourly bars...")
+            for case in bench_case(n_symbols, hourly_bars, args.repeat):
+                cases.append(case)
+                print(f"  {case['stage']:<44} median {case['median'] * 1000:10.2f} ms")
+
+    run = {
+        'commit': current_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': cases,
+    }
+
+    baseline = None
+    if args.compare:
+        matching = [r for r in load_runs() if r['commit'].startswith(args.compare)]
+        if not matching:
+            print(f"No stored run for commit {args.compare}")
+        else:
+            baseline = matching[-1]
+
+    if not args.no_save:
+        with open(RESULTS_FILE, 'a') as f:
+            f.write(json.dumps(run) + '\n')
+
+    if baseline is not None and compare(run, baseline):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Synthetic multi-symbol OHLCV data in yfinance's layout.
+
+SyntheticMarket.download mirrors yf.download(..., group_by='ticker'): a
+DataFrame with (Ticker, Price) MultiIndex columns and a tz-aware index on
+NSE session times for 1m, 1h and 1d bars. SyntheticMarket.ticker(symbol)
+stands in for yf.Ticker(symbol), whose history() returns one symbol's bars.
+Prices are a seeded random walk per symbol and interval, so repeated and
+incremental (start=...) downloads return the same values for the same
+timestamps.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+MARKET_TZ = 'Asia/Kolkata'
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# Bar start times within one session for each intraday interval
+SESSION_BARS = {
+    '1m': pd.timedelta_range('9h15min', '15h29min', freq='1min'),
+    '1h': pd.timedelta_range('9h15min', '15h15min', freq='1h'),
+}
+
+# Default history sizes, roughly what the app requests per interval
+DEFAULT_BARS = {
+    '1m': 375,   # one session
+    '1h': 441,   # ~3 months
+    '1d': 500,   # ~2 years
+}
+
+
+class SyntheticMarket:
+    def __init__(self, bars=None, end=None, seed=0):
+        self.bars = dict(DEFAULT_BARS, **(bars or {}))
+        self.end = end if end is not None else pd.Timestamp.now(tz=MARKET_TZ)
+        self.seed = seed
+        self._frames = {}
+
+    def timeline(self, interval):
+        n_bars = self.bars[interval]
+        if interval == '1d':
+            days = pd.bdate_range(end=self.end.date(), periods=n_bars)
+            return days.tz_localize(MARKET_TZ)
+
+        offsets = SESSION_BARS[interval]
+        days = pd.bdate_range(end=self.end.date(), periods=n_bars // len(offsets) + 2)
+        stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+        index = pd.DatetimeIndex(stamps).tz_localize(MARKET_TZ)
+        index = index[index <= self.end]
+        return index[-n_bars:]
+
+    def frame(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._frames:
+            index = self.timeline(interval)
+            rng = np.random.default_rng([self.seed, zlib.crc32(f'{symbol}|{interval}'.encode())])
+            n_bars = len(index)
+            base = rng.uniform(50, 5000)
+            close = base * np.exp(np.cumsum(rng.normal(0, 0.004, n_bars)))
+            open_ = np.concatenate([[base], close[:-1]]) * (1 + rng.normal(0, 0.001, n_bars))
+            high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n_bars)))
+            low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n_bars)))
+            volume = rng.integers(1_000, 1_000_000, n_bars).astype('float64')
+            self._frames[key] = pd.DataFrame({
+                'Open': open_, 'High': high, 'Low': low, 'Close': close,
+                'Adj Close': close, 'Volume': volume,
+            }, index=index)
+        return self._frames[key]
+
+    def history(self, symbol, interval='1d', start=None):
+        frame = self.frame(symbol, interval)
+        if start is not None:
+            start_ts = pd.Timestamp(start, unit='s', tz='UTC') if isinstance(start, (int, float)) \
+                else pd.Timestamp(start)
+            frame = frame[frame.index >= start_ts]
+        return frame
+
+    def ticker(self, symbol):
+        return SyntheticTicker(self, symbol)
+
+    def download(self, tickers, period=None, interval='1d', start=None, end=None,
+                 group_by='ticker', threads=True, **kwargs):
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        frames = {symbol: self.history(symbol, interval, start) for symbol in tickers}
+        if not frames:
+            return pd.DataFrame()
+        data = pd.concat(frames, axis=1)
+        data.columns.names = ['Ticker', 'Price']
+        return data
+
+
+class SyntheticTicker:
+    def __init__(self, market, symbol):
+        self.market = market
+        self.symbol = symbol
+
+    def history(self, period=None, interval='1d', start=None, end=None, **kwargs):
+        return self.market.history(self.symbol, interval, start).copy()
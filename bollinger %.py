@@ -1,9 +1,21 @@
+import argparse
+
 import yfinance as yf
 import pandas as pd
 import pandas_ta as ta
 import numpy as np
 import time
 
+import bar_aggregation
+import fetch_executor
+import indicator_engine
+import symbol_registry
+import universe
+
+# Batch scanner: tickers per yf.download call; concurrency and rate limits live in fetch_executor
+BATCH_CHUNK_SIZE = 50
+BATCH_RESULTS_FILE = 'bollinger_scan.csv'
+
 def get_bollinger_percentage(stock_symbol):
     try:
         # Fetch stock data with a 1-hour interval
@@ -13,14 +25,9 @@ def get_bollinger_percentage(stock_symbol):
             print(f"Error: No data fetched for {stock_symbol}")
             return None
 
-        # Resample to 2-hour intervals
-        stock_data = stock_data_1h.resample('2h').agg({
-            'Open': 'first',  # Take the first value for the open price
-            'High': 'max',    # Take the maximum value for the high price
-            'Low': 'min',     # Take the minimum value for the low price
-            'Close': 'last',  # Take the last value for the close price
-            'Volume': 'sum'   # Sum the volume traded in the 2-hour interval
-        }).dropna()
+        # Resample to 2-hour intervals starting at the 09:15 session open
+        # (first Open, max High, min Low, last Close, summed Volume)
+        stock_data = bar_aggregation.resample_bars(stock_data_1h, '2h')
 
         if stock_data.empty:
             print(f"Error: No data after resampling for {stock_symbol}")
@@ -48,236 +55,92 @@ def get_bollinger_percentage(stock_symbol):
         print(f"An error occurred for {stock_symbol}: {e}")
         return None
 
+def alert_for(bollinger_percentage):
+    if bollinger_percentage < 0:
+        return 'below 0%'
+    elif bollinger_percentage < 5:  # Adjust the threshold as needed
+        return 'approaching 0%'
+    return ''
+
+def report_bollinger_percentage(stock_symbol, bollinger_percentage):
+    print(f"Current Bollinger %b for {stock_symbol}: {bollinger_percentage:.2f}%")
+    alert = alert_for(bollinger_percentage)
+    if alert == 'below 0%':
+        print(f"ALERT: Bollinger %b for {stock_symbol} has dropped below 0%!")
+    elif alert == 'approaching 0%':
+        print(f"ALERT: Bollinger %b for {stock_symbol} is approaching 0%!")
+
 def check_bollinger_percentage(stock_symbol):
     bollinger_percentage = get_bollinger_percentage(stock_symbol)
 
     if bollinger_percentage is not None:
-        print(f"Current Bollinger %b for {stock_symbol}: {bollinger_percentage:.2f}%")
-        if bollinger_percentage < 0:
-            print(f"ALERT: Bollinger %b for {stock_symbol} has dropped below 0%!")
-        elif bollinger_percentage < 5:  # Adjust the threshold as needed
-            print(f"ALERT: Bollinger %b for {stock_symbol} is approaching 0%!")
+        report_bollinger_percentage(stock_symbol, bollinger_percentage)
+
+def download_universe(stock_symbols, chunk_size=BATCH_CHUNK_SIZE):
+    # Chunked, rate limited and retried; failed chunks are simply missing
+    return fetch_executor.download(stock_symbols, chunk_size=chunk_size, period="1mo", interval="1h")
+
+def batch_bollinger_percentages(stock_symbols):
+    """Latest 2-hour Bollinger %b(20, 2) on OHLC4 for every symbol, NaN where unavailable."""
+    stock_data_1h = download_universe(stock_symbols)
+    if stock_data_1h.empty:
+        print("Error: No data fetched for any symbol")
+        return pd.Series(np.nan, index=stock_symbols)
+
+    # Only buckets holding a bar are produced, like dropna() after a resample
+    panels, counts = indicator_engine.build_panel(bar_aggregation.aggregate_frame(stock_data_1h, '2h'), stock_symbols)
+    ohlc4 = indicator_engine.ohlc4_panel(panels)
+    percent_b = indicator_engine.percent_b_panel(ohlc4, length=20, std=2, mamode='sma')
+    latest = percent_b[-1] if len(percent_b) else np.full(len(stock_symbols), np.nan)
+    latest = np.where(counts >= 20, latest, np.nan)
+    return pd.Series(latest, index=stock_symbols)
+
+def run_batch_scan(stock_symbols, output_file=BATCH_RESULTS_FILE):
+    start = time.perf_counter()
+    percentages = batch_bollinger_percentages(stock_symbols)
+
+    for symbol in percentages.index[percentages.isna()]:
+        print(f"Error: No Bollinger %b for {symbol}")
+    percentages = percentages.dropna().sort_values()
+
+    # Ranked lowest %b first, i.e. closest to or through the lower band
+    results = pd.DataFrame({
+        'Symbol': percentages.index,
+        'Bollinger_%b': percentages.round(2).values,
+        'Alert': [alert_for(value) for value in percentages.values],
+    })
+    results.index = np.arange(1, len(results) + 1)
+    results.index.name = 'Rank'
+    results.to_csv(output_file)
+
+    for symbol, value in percentages.items():
+        report_bollinger_percentage(symbol, value)
+    print(f"Scanned {len(stock_symbols)} symbols in {time.perf_counter() - start:.1f}s, "
+          f"{len(results)} ranked in {output_file}")
+    return results
+
+# List of stock symbols (the 'scan' list of universe.json)
+stock_symbols = universe.symbols('scan')
 
-# List of stock symbols
-stock_symbols = [
-    'DEEPAKFERT.NS',
-    'MRPL.NS',
-    'APOLLOTYRE.NS',
-    'ASKOKLEY.NS',
-    'BAJAJ.NS-AUTO',
-    'BALKRISIND.NS',
-    'BASCHLTD.NS',
-    'BHARATFORG.NS',
-    'EICHERMOT.NS',
-    'HEROMOTOCO.NS',
-    'M.NS&M',
-    'MARUTI.NS',
-    'MOTHERSON.NS',
-    'MRF.NS',
-    'TATAMOTORS.NS',
-    'TATAMTRDVR.NS',
-    'TVSMOTOR.NS',
-    'AUBANK.NS',
-    'AXISBANK.NS',
-    'BANDHANBNK.NS',
-    'BANKBARODA.NS',
-    'CANBK.NS',
-    'CENTRALBK.NS',
-    'CUB.NS',
-    'FEDERALBNK.NS',
-    'HDFCBANK.NS',
-    'ICICIBANK.NS',
-    'IDFCFIRSTB.NS',
-    'INDUSINDBK.NS',
-    'KOTAKBANK.NS',
-    'PNB.NS',
-    'RBLBANK.NS',
-    'SBIN.NS',
-    'YESBANK.NS',
-    'ABB.NS',
-    'ASTRAL.NS',
-    'BEL.NS',
-    'BHEL.NS',
-    'CROMPTON.NS',
-    'CUMMINSIND.NS',
-    'DIXON.NS',
-    'HAL.NS',
-    'HAVELS.NS',
-    'LT.NS',
-    'POLYCAB.NS',
-    'SIEMENS.NS',
-    'VOLTAS.NS',
-    'ACC.NS',
-    'AMBUJACEM.NS',
-    'DALBHARAT.NS',
-    'GRASIM.NS',
-    'INDIACEM.NS',
-    'JKCEMENT.NS',
-    'RAMCOCEM.NS',
-    'SHREECEM.NS',
-    'STARCEMENT.NS',
-    'ULTRACEMCO.NS',
-    'AARTIIND.NS',
-    'ATUL.NS',
-    'CHAMBLFERT.NS',
-    'COROMANDEL.NS',
-    'DEEPAKNTR.NS',
-    'GNFC.NS',
-    'NAVINFLUOR.NS',
-    'PIDLITIND.NS',
-    'PIIND.NS',
-    'TATACHEM.NS',
-    'UPL.NS',
-    'ABCAPITAL.NS',
-    'BAJAJFINSV.NS',
-    'BAJFINANCE.NS',
-    'CANFINHOME.NS',
-    'CHOLAFIN.NS',
-    'HDFCAMC.NS',
-    'HDFCLIFE.NS',
-    'ICICIGI.NS',
-    'ICICIPRULI.NS',
-    'IDFC.NS',
-    'L.NS&TFH',
-    'LICHSGFIN.NS',
-    'LICI.NS',
-    'M.NS&MFIN',
-    'MANAPPURAM.NS',
-    'MFSL.NS',
-    'MUTHOOTFIN.NS',
-    'PEL.NS',
-    'PFC.NS',
-    'RECLTD.NS',
-    'SBICARD.NS',
-    'SBILIFE.NS',
-    'SRIRAMFIN.NS',
-    'ASIANPAINT.NS',
-    'AWL.NS',
-    'BALRAMCHIN.NS',
-    'BATAINDIA.NS',
-    'BERGEPAINT.NS',
-    'BRITANNIA.NS',
-    'COLPAL.NS',
-    'DABUR.NS',
-    'GODFRYPHLP.NS',
-    'GODREJCP.NS',
-    'HINDUNILVR.NS',
-    'INDIAMART.NS',
-    'ITC.NS',
-    'MARICO.NS',
-    'NESTLEIND.NS',
-    'SIRCA.NS',
-    'TATACONSUM.NS',
-    'TITAN.NS',
-    'UBL.NS',
-    'ZYDUSWELL.NS',
-    'ADANIENT.NS',
-    'ADANIPORTS.NS',
-    'CONCOR.NS',
-    'GMRINFRA.NS',
-    'INDIGO.NS',
-    'IRCTC.NS',
-    'APOLLO.NS',
-    'BSOFT.NS',
-    'COFORGE.NS',
-    'FSL.NS',
-    'HCLTECH.NS',
-    'HGS.NS',
-    'INFY.NS',
-    'INTELLECT.NS',
-    'KPITECH.NS',
-    'LTIM.NS',
-    'LTTS.NS',
-    'MCX.NS',
-    'MPHASIS.NS',
-    'NAUKRI.NS',
-    'OFSS.NS',
-    'PERSISTENT.NS',
-    'TATAELAXI.NS',
-    'TCS.NS',
-    'TECHM.NS',
-    'WIPRO.NS',
-    'ZENTEC.NS',
-    'PVRINOX.NS',
-    'SUNTV.NS',
-    'ZEEL.NS',
-    'APLAPOLLO.NS',
-    'COALINDIA.NS',
-    'HINDALCO.NS',
-    'HINDCOPPER.NS',
-    'HINDZINC.NS',
-    'JINDSTEL.NS',
-    'JSWSTEEL.NS',
-    'NATIONALUM.NS',
-    'NMDC.NS',
-    'SAIL.NS',
-    'TATASTEEL.NS',
-    'VEDL.NS',
-    'BPCL.NS',
-    'GAIL.NS',
-    'GUJGASLTD.NS',
-    'HINDPETRO.NS',
-    'IGL.NS',
-    'IOC.NS',
-    'MGL.NS',
-    'ONGC.NS',
-    'PETRONET.NS',
-    'RELIANCE.NS',
-    'BAJAJHIND.NS',
-    'DEVYANI.NS',
-    'GRSE.NS ',
-    'IRFC.NS',
-    'NYKAA.NS',
-    'POLYPLEX.NS',
-    'RAJPACK.NS',
-    'RENUKA.NS',
-    'RVNL.NS',
-    'TTKPRESTIG.NS',
-    'ZOMATO.NS ',
-    'ABBOTINDIA.NS',
-    'ALKEM.NS',
-    'APOLOHOSP.NS',
-    'AUROPHARMA.NS',
-    'BIOCON.NS',
-    'CIPLA.NS',
-    'DIVISLAB.NS',
-    'DRREDDY.NS',
-    'GLENMARK.NS',
-    'GRANULES.NS',
-    'IPCALAB.NS',
-    'LALPATHLAB.NS',
-    'LAURULABS.NS',
-    'LUPIN.NS',
-    'METROPOLIS.NS',
-    'SUNPHARMA.NS',
-    'SYNGENE.NS',
-    'TORNPHARM.NS',
-    'ZYDUSLIFE.NS',
-    'IEX.NS',
-    'NTPC.NS',
-    'POWERGRID.NS',
-    'SUZLON.NS',
-    'TATAPOWER.NS',
-    'DELTACORP.NS',
-    'DLF.NS',
-    'GODREJPROP.NS',
-    'INDHOTEL.NS',
-    'OBEROIRLTY.NS',
-    'BHARTIARTL.NS',
-    'IDEA.NS',
-    'INDUSTOWER.NS',
-    'TATACOMM.NS',
-    'TELECOM.NS',
-    'ABFRL.NS',
-    'PAGEIND.NS',
-    'RAYMOND.NS',
-    'SRF.NS',
-    'TRENT.NS',
-]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Daily Bollinger %b check for the stock list.")
+    parser.add_argument('--batch', action='store_true',
+                        help="fetch in chunked multi-ticker requests and write a ranked results table")
+    parser.add_argument('--output', default=BATCH_RESULTS_FILE, help="results table for --batch")
+    parser.add_argument('--once', action='store_true', help="run a single check instead of daily")
+    args = parser.parse_args()
 
-# Check Bollinger Percentage in a loop (e.g., every day)
-while True:
-    for symbol in stock_symbols:
-        check_bollinger_percentage(symbol)
-    # Wait for 24 hours before checking again
-    time.sleep(24 * 60 * 60)
\ No newline at end of file
+    # Check Bollinger Percentage in a loop (e.g., every day)
+    while True:
+        # Re-read the list each day so edits to universe.json apply without a restart, and
+        # skip symbols the registry knows to be bad (see check_symbols.py --validate)
+        stock_symbols = symbol_registry.filter_valid(universe.symbols('scan'))
+        if args.batch:
+            run_batch_scan(stock_symbols, args.output)
+        else:
+            for symbol in stock_symbols:
+                check_bollinger_percentage(symbol)
+        if args.once:
+            break
+        # Wait for 24 hours before checking again
+        time.sleep(24 * 60 * 60)
@@ -1,5 +1,10 @@
+import argparse
+
 import yfinance as yf
 
+import symbol_registry
+import universe
+
 def check_stock_symbols(symbols):
     for symbol in symbols:
         try:
@@ -13,127 +18,43 @@ def check_stock_symbols(symbols):
             print(f"Error: {symbol} may not be listed or there was an issue fetching data. {e}")
     print('checking completed')
 
-# List of stock symbols to check
+def validate_and_report(symbols, workers, force):
+    entries = symbol_registry.validate_symbols(symbols, workers=workers, force=force)
+    for symbol in symbols:
+        entry = entries.get(symbol)
+        if entry is None:
+            print(f"Unchecked: {symbol!r} (the check failed, try again later)")
+        elif entry['status'] != symbol_registry.VALID:
+            print(f"Invalid: {symbol!r} ({entry['reason']})")
+    valid = sum(1 for entry in entries.values() if entry['status'] == symbol_registry.VALID)
+    print(f"{valid} of {len(symbols)} symbols valid, registry at {symbol_registry.REGISTRY_FILE}")
+
+# List of stock symbols to check (the 'check' list of universe.json)
+
+symbols = universe.symbols('check')
+
 
-symbols = [
-    '^CNXAUTO',
-    '^CNXFMCG',
-    '^CNXIT',
-    '^CNXMETAL',
-    '^CNXPHARMA',
-    '^NSEBANK',
-    '^NSEI',
-    '^BSESN',
-    'ABB.NS',
-    'ACC.NS',
-    'APLAPOLLO.NS',
-    'APOLLOTYRE.NS',
-    'ASIANPAINT.NS',
-    'AXISBANK.NS',
-    'BAJAJ-AUTO.NS',
-    'BANKBARODA.NS',
-    'BATAINDIA.NS',
-    'BEL.NS',
-    'BEML.NS',
-    'BEPL.NS',
-    'BERGEPAINT.NS',
-    'BHARTIARTL.NS',
-    'BHEL.NS',
-    'BPCL.NS',
-    'BRITANNIA.NS',
-    'BSOFT.NS',
-    'CANBK.NS',
-    'CASTROLIND.NS',
-    'CDSL.NS',
-    'CHAMBLFERT.NS',
-    'CIPLA.NS',
-    'COALINDIA.NS',
-    'CONCOR.NS',
-    'CROMPTON.NS',
-    'CUMMINSIND.NS',
-    'DABUR.NS',
-    'DALBHARAT.NS',
-    'DRREDDY.NS',
-    'EICHERMOT.NS',
-    'ESCORTS.NS',
-    'FSL.NS',
-    'GAIL.NS',
-    'GESHIP.NS',
-    'GODFRYPHLP.NS',
-    'GRSE.NS',
-    'HAL.NS',
-    'HAVELLS.NS',
-    'HCLTECH.NS',
-    'HDFCBANK.NS',
-    'HEROMOTOCO.NS',
-    'HINDALCO.NS',
-    'HINDCOPPER.NS',
-    'HINDUNILVR.NS',
-    'HINDZINC.NS',
-    'ICICIBANK.NS',
-    'IEX.NS',
-    'INDHOTEL.NS',
-    'INDIAMART.NS',
-    'INDUSINDBK.NS',
-    'INFY.NS',
-    'INTELLECT.NS',
-    'IOC.NS',
-    'IRCTC.NS',
-    'ITC.NS',
-    'JKTYRE.NS',
-    'JSWSTEEL.NS',
-    'JYOTHYLAB.NS',
-    'KNRCON.NS',
-    'KOTAKBANK.NS',
-    'KPITTECH.NS',
-    'LICI.NS',
-    'LT.NS',
-    'LTIM.NS',
-    'M&M.NS',
-    'MARICO.NS',
-    'MARUTI.NS',
-    'MRPL.NS',
-    'NATCOPHARM.NS',
-    'NATIONALUM.NS',
-    'NESTLEIND.NS',
-    'NMDC.NS',
-    'NTPC.NS',
-    'ONGC.NS',
-    'PIDILITIND.NS',
-    'POLYCAB.NS',
-    'POWERGRID.NS',
-    'RAYMOND.NS',
-    'RELIANCE.NS',
-    'RENUKA.NS',
-    'RITES.NS',
-    'RVNL.NS',
-    'SAIL.NS',
-    'SBIN.NS',
-    'SIRCA.NS',
-    'SRF.NS',
-    'SUNPHARMA.NS',
-    'TANLA.NS',
-    'TATACHEM.NS',
-    'TATAELXSI.NS',
-    'TATAMOTORS.NS',
-    'TATAPOWER.NS',
-    'TATASTEEL.NS',
-    'TATATECH.NS',
-    'TCS.NS',
-    'TECHM.NS',
-    'TITAN.NS',
-    'TRITURBINE.NS',
-    'UBL.NS',
-    'USHAMART.NS',
-    'VBL.NS',
-    'VEDL.NS',
-    'VOLTAS.NS',
-    'VSTIND.NS',
-    'WIPRO.NS',
-    'ZENTEC.NS',
-    'ZOMATO.NS',
-    ]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check that stock symbols are listed on Yahoo Finance.")
+    parser.add_argument('--validate', action='store_true',
+                        help="check concurrently with a minimal request and record results in the symbol registry")
+    parser.add_argument('--lists', nargs='+', default=['check'], choices=universe.LISTS,
+                        help="universe.json lists to check")
+    parser.add_argument('--all', action='store_true', help="check every symbol in universe.json")
+    parser.add_argument('--workers', type=int, default=symbol_registry.VALIDATION_WORKERS)
+    parser.add_argument('--force', action='store_true', help="re-check symbols whose registry entry is still fresh")
+    args = parser.parse_args()
 
+    loaded = universe.load_universe()
+    if args.all:
+        to_check = universe.all_symbols(loaded)
+    else:
+        to_check = []
+        for name in args.lists:
+            to_check += [symbol for symbol in loaded[name] if symbol not in to_check]
 
-# Check if each stock symbol is listed
-check_stock_symbols(symbols)
+    if args.validate:
+        validate_and_report(to_check, args.workers, args.force)
+    else:
+        # Check if each stock symbol is listed
+        check_stock_symbols(to_check)
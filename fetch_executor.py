@@ -0,0 +1,211 @@
+"""
+Chunked, rate-limited yfinance downloads.
+
+download() is a drop-in for yf.download(symbols, ..., group_by='ticker')
+that splits the symbols into chunks and runs them on a shared pool:
+
+- A chunk is fetched symbol by symbol with yf.Ticker(symbol).history(),
+  which is what yf.download does internally, minus the module-global
+  result state (yfinance.shared) that every yf.download call resets.
+  Chunks can therefore really run side by side without picking up each
+  other's frames.
+- Every request takes one of FETCH_CONCURRENCY slots and a token from a
+  FETCH_RATE_PER_SECOND token bucket, across all callers in the process.
+- A chunk that raises (or comes back empty for a period download, which
+  never happens for valid symbols) is retried with exponential backoff
+  and jitter.
+- A chunk still running well after the others finished is hedged: the
+  same request is issued again and whichever copy answers first is used.
+  Time spent waiting for a request slot does not count towards that.
+- Chunks that still fail are logged and left out, so the caller gets the
+  symbols that did arrive instead of nothing.
+"""
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import lazy_imports
+import metrics
+
+pd = lazy_imports.lazy_import('pandas')
+yf = lazy_imports.lazy_import('yfinance')
+
+FETCH_CHUNK_SIZE = 50
+FETCH_CONCURRENCY = 4
+FETCH_RATE_PER_SECOND = 2.0
+FETCH_RATE_BURST = 4
+FETCH_RETRIES = 2
+FETCH_BACKOFF_SECONDS = 1.0
+FETCH_BACKOFF_MAX_SECONDS = 8.0
+
+# A chunk is hedged once it runs this many times longer than the median
+# finished chunk, and never before HEDGE_MIN_SECONDS
+HEDGE_FACTOR = 3.0
+HEDGE_MIN_SECONDS = 2.0
+HEDGE_POLL_SECONDS = 0.25
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+rate_limiter = RateLimiter(FETCH_RATE_PER_SECOND, FETCH_RATE_BURST)
+request_slots = threading.BoundedSemaphore(FETCH_CONCURRENCY)
+
+# Hedged copies need room beside the chunks they shadow; request_slots bounds the real concurrency
+_pool = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY * 2, thread_name_prefix='fetch')
+
+
+def _history(symbol, kwargs):
+    frame = yf.Ticker(symbol).history(actions=False, **kwargs)
+    if frame is not None and not frame.empty and kwargs.get('interval', '1d')[-1] not in ('m', 'h'):
+        # yf.download drops the timezone of daily and longer bars
+        frame.index = frame.index.tz_localize(None)
+    return frame
+
+
+def _request(chunk, kwargs, on_start=None):
+    rate_limiter.acquire()
+    with request_slots:
+        if on_start is not None:
+            on_start()
+        frames = {}
+        errors = []
+        for symbol in chunk:
+            try:
+                frames[symbol] = _history(symbol, kwargs)
+            except Exception as e:
+                # Like yf.download, one bad symbol does not sink the chunk
+                errors.append(e)
+                print(f"Error fetching {symbol}: {e}")
+    if errors and len(errors) == len(chunk):
+        raise errors[-1]
+    frames = {symbol: frame for symbol, frame in frames.items() if frame is not None and not frame.empty}
+    if not frames:
+        return pd.DataFrame()
+    # yf.download(..., group_by='ticker') layout: one (Ticker, Price) column block per symbol
+    return pd.concat(frames, axis=1, sort=True, names=['Ticker', 'Price'])
+
+
+def fetch_chunk(chunk, kwargs, retries=FETCH_RETRIES, on_start=None):
+    """
+    Download one chunk with retries; returns (frame or None, seconds taken
+    since its first request got a slot). on_start() is called each time a
+    request gets a slot.
+    """
+    started = []
+
+    def mark_start():
+        if not started:
+            started.append(time.monotonic())
+        if on_start is not None:
+            on_start()
+
+    def elapsed():
+        return time.monotonic() - started[0] if started else 0.0
+
+    # Tail downloads (start=...) are legitimately empty when no new bar formed
+    retry_empty = 'period' in kwargs
+    for attempt in range(retries + 1):
+        try:
+            frame = _request(chunk, kwargs, mark_start)
+            if frame is not None and not (retry_empty and frame.empty):
+                return frame, elapsed()
+            reason = 'empty'
+        except Exception as e:
+            reason = 'error'
+            print(f"Error fetching {len(chunk)} symbols starting at {chunk[0]} (attempt {attempt + 1}): {e}")
+        if attempt < retries:
+            metrics.FETCH_RETRIES.inc(reason=reason)
+            backoff = min(FETCH_BACKOFF_MAX_SECONDS, FETCH_BACKOFF_SECONDS * 2 ** attempt)
+            time.sleep(backoff * random.uniform(0.5, 1.5))
+    return None, elapsed()
+
+
+def download(stock_symbols, chunk_size=FETCH_CHUNK_SIZE, **kwargs):
+    """
+    yf.download(stock_symbols, group_by='ticker', **kwargs), fetched in
+    chunks. Symbols whose chunk failed are missing from the result.
+    """
+    stock_symbols = list(stock_symbols)
+    chunks = [stock_symbols[i:i + chunk_size] for i in range(0, len(stock_symbols), chunk_size)]
+    if not chunks:
+        return pd.DataFrame()
+
+    owners = {}        # future -> chunk index
+    outstanding = {}   # chunk index -> attempts still running
+    started = {}       # chunk index -> when its first request got a slot
+
+    def attempt(index, retries):
+        return fetch_chunk(chunks[index], kwargs, retries,
+                           on_start=lambda: started.setdefault(index, time.monotonic()))
+
+    for index in range(len(chunks)):
+        owners[_pool.submit(attempt, index, FETCH_RETRIES)] = index
+        outstanding[index] = 1
+
+    results = {}
+    durations = []
+    hedged = set()
+    pending = set(owners)
+    while len(results) < len(chunks):
+        done, pending = wait(pending, timeout=HEDGE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = owners[future]
+            outstanding[index] -= 1
+            if index in results:
+                continue
+            frame, elapsed = future.result()
+            # A failed attempt waits for its hedge, if one is still running
+            if frame is None and outstanding[index]:
+                continue
+            results[index] = frame
+            durations.append(elapsed)
+            metrics.FETCH_CHUNK_SECONDS.observe(elapsed)
+
+        if durations:
+            threshold = max(HEDGE_MIN_SECONDS, HEDGE_FACTOR * statistics.median(durations))
+            now = time.monotonic()
+            for index, start in list(started.items()):
+                if index in results or index in hedged or now - start < threshold:
+                    continue
+                hedged.add(index)
+                metrics.FETCH_HEDGES.inc()
+                # One attempt only: the original is still retrying on its own
+                future = _pool.submit(attempt, index, 0)
+                owners[future] = index
+                outstanding[index] += 1
+                pending.add(future)
+
+    frames = []
+    for index, chunk in enumerate(chunks):
+        frame = results[index]
+        if frame is None:
+            metrics.FETCH_CHUNKS_FAILED.inc()
+            print(f"Giving up on {len(chunk)} symbols starting at {chunk[0]} for this cycle")
+        elif not frame.empty:
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
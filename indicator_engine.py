@@ -0,0 +1,232 @@
+"""
+Cross-sectional indicator engine.
+
+Every symbol is lined up in one (time x symbol) NumPy panel per field, so
+OHLC4, RSI, EMA Bollinger %b and the daily change metrics are computed for
+the whole universe in a handful of array passes instead of one pandas_ta
+call chain per symbol.
+
+Panels are right-aligned: each column holds that symbol's own bars with its
+latest bar in the last row and NaN padding on top. Rows where a symbol has
+no bar (the NaN rows of yfinance's multi-ticker join) are dropped first,
+which keeps positional lookbacks such as "close 5 days ago" per symbol.
+"""
+import numpy as np
+
+import lazy_imports
+
+pd = lazy_imports.lazy_import('pandas')
+
+RSI_LENGTH = 20
+BB_LENGTH = 120
+BB_STD = 2
+
+PRICE_FIELDS = ('Open', 'High', 'Low', 'Close')
+
+CHANGE_PERIODS = {
+    '1 day': 1,
+    '5 days': 5,
+    '20 days': 20,
+    '1 year': 252  # Approximate trading days in a year
+}
+
+
+def build_panel(stock_data, stock_symbols, fields=PRICE_FIELDS):
+    """
+    Turn a group_by='ticker' frame into right-aligned (time x symbol) arrays.
+    Returns the per-field panels and the number of bars each symbol has.
+    """
+    n_symbols = len(stock_symbols)
+    if stock_data is None or stock_data.empty or not isinstance(stock_data.columns, pd.MultiIndex):
+        empty = np.empty((0, n_symbols))
+        return {field: empty for field in fields}, np.zeros(n_symbols, dtype=np.int64)
+
+    stock_data = stock_data.sort_index()
+    raw = {}
+    for field in fields:
+        if field in stock_data.columns.get_level_values(1):
+            frame = stock_data.xs(field, axis=1, level=1)
+            raw[field] = frame.reindex(columns=stock_symbols).to_numpy(dtype='float64')
+        else:
+            raw[field] = np.full((len(stock_data), n_symbols), np.nan)
+
+    # A symbol has a bar wherever its close is known
+    valid = ~np.isnan(raw['Close'])
+    counts = valid.sum(axis=0)
+    # Stable sort puts padding first and keeps the symbol's bars in time order
+    order = np.argsort(valid, axis=0, kind='stable')
+
+    panels = {}
+    for field in fields:
+        aligned = np.take_along_axis(raw[field], order, axis=0)
+        aligned[~np.take_along_axis(valid, order, axis=0)] = np.nan
+        panels[field] = aligned
+    return panels, counts
+
+
+def ohlc4_panel(panels):
+    stacked = np.stack([panels[field] for field in PRICE_FIELDS])
+    present = ~np.isnan(stacked)
+    total = np.where(present, stacked, 0.0).sum(axis=0)
+    count = present.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def ema_panel(values, length):
+    # pandas_ta's ema: seeded with the SMA of the first `length` bars, then adjust=False
+    n_rows, n_cols = values.shape
+    present = ~np.isnan(values)
+    first = np.where(present.any(axis=0), np.argmax(present, axis=0), n_rows)
+    seed_row = first + length - 1
+    seedable = seed_row < n_rows
+
+    # Window sums from one cumulative pass give every column's seed at once
+    cumulative = np.vstack([np.zeros(n_cols), np.cumsum(np.where(present, values, 0.0), axis=0)])
+    cols = np.arange(n_cols)[seedable]
+    seed = (cumulative[seed_row[seedable] + 1, cols] - cumulative[first[seedable], cols]) / length
+
+    rows = np.arange(n_rows)[:, None]
+    seeded = np.where(rows > seed_row, values, np.nan)
+    seeded[seed_row[seedable], cols] = seed
+    return pd.DataFrame(seeded).ewm(span=length, adjust=False).mean().to_numpy()
+
+
+def sma_panel(values, length):
+    return pd.DataFrame(values).rolling(length).mean().to_numpy()
+
+
+def rolling_std_panel(values, length):
+    # Population std (ddof=0) as used by ta.bbands
+    return pd.DataFrame(values).rolling(length).std(ddof=0).to_numpy()
+
+
+def rsi_panel(values, length=RSI_LENGTH):
+    # Same definition as ta.rsi: Wilder (rma) averages of gains and losses
+    change = np.diff(values, axis=0, prepend=np.nan)
+    gains = np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0))
+    losses = np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0))
+    alpha = 1.0 / length
+    avg_gain = pd.DataFrame(gains).ewm(alpha=alpha, min_periods=length).mean().to_numpy()
+    avg_loss = pd.DataFrame(losses).ewm(alpha=alpha, min_periods=length).mean().to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def percent_b_panel(values, length=BB_LENGTH, std=BB_STD, mamode='ema'):
+    mid = ema_panel(values, length) if mamode == 'ema' else sma_panel(values, length)
+    deviation = std * rolling_std_panel(values, length)
+    lower = mid - deviation
+    upper = mid + deviation
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (values - lower) / (upper - lower) * 100
+
+
+def _last_row(panel):
+    if panel.shape[0] == 0:
+        return np.full(panel.shape[1], np.nan)
+    return panel[-1]
+
+
+def build_panels(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols):
+    """
+    Align the three downloads into flat NumPy arrays, one column per symbol
+    in stock_symbols order.
+    """
+    hourly, count_1h = build_panel(stock_data_1h, stock_symbols)
+    return dict(build_daily_panels(stock_data_daily, stock_data_minute, stock_symbols),
+                open_1h=hourly['Open'], high_1h=hourly['High'], low_1h=hourly['Low'], close_1h=hourly['Close'],
+                count_1h=count_1h)
+
+
+def build_daily_panels(stock_data_daily, stock_data_minute, stock_symbols):
+    """The daily and minute part of build_panels, for engines that keep their own hourly state."""
+    daily, count_1d = build_panel(stock_data_daily, stock_symbols, fields=('High', 'Low', 'Close'))
+
+    day_high = np.full(len(stock_symbols), np.nan)
+    day_low = np.full(len(stock_symbols), np.nan)
+    if stock_data_minute is not None and not stock_data_minute.empty:
+        for field, target in (('High', day_high), ('Low', day_low)):
+            if field in stock_data_minute.columns.get_level_values(1):
+                frame = stock_data_minute.xs(field, axis=1, level=1).reindex(columns=stock_symbols)
+                target[:] = frame.max().to_numpy() if field == 'High' else frame.min().to_numpy()
+
+    return {
+        'high_1d': daily['High'],
+        'low_1d': daily['Low'],
+        'close_1d': daily['Close'],
+        'count_1d': count_1d,
+        'day_high': day_high,
+        'day_low': day_low,
+    }
+
+
+def latest_bollinger_b(price_panels):
+    """Latest EMA Bollinger %b per symbol from Open/High/Low/Close panels of any timeframe."""
+    return _last_row(percent_b_panel(ohlc4_panel(price_panels), BB_LENGTH, BB_STD, mamode='ema'))
+
+
+def results_from_panels(panels, stock_symbols, bollinger_b=None, rsi=None, value=None):
+    # Callers that keep their own indicator state, or take %b from another
+    # timeframe, pass the latest %b and/or RSI in; with all three given,
+    # panels needs no hourly price panels, only count_1h
+    if bollinger_b is None or rsi is None:
+        ohlc4 = ohlc4_panel({'Open': panels['open_1h'], 'High': panels['high_1h'],
+                             'Low': panels['low_1h'], 'Close': panels['close_1h']})
+        if rsi is None:
+            rsi = _last_row(rsi_panel(ohlc4, RSI_LENGTH))
+        if bollinger_b is None:
+            bollinger_b = _last_row(percent_b_panel(ohlc4, BB_LENGTH, BB_STD, mamode='ema'))
+    if value is None:
+        value = _last_row(panels['close_1h'])
+
+    count_1h = panels['count_1h']
+    count_1d = panels['count_1d']
+    close_1d = panels['close_1d']
+    n_daily = close_1d.shape[0]
+
+    # Past daily bars for every period, looked up for all symbols at once
+    past = {}
+    for period_name, period_length in CHANGE_PERIODS.items():
+        row = n_daily - (period_length + 1)
+        if row < 0:
+            continue
+        past_close = close_1d[row]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value_change = value - past_close
+            percent_change = value_change / past_close * 100
+        past[period_name] = (count_1d >= period_length + 1, value_change, percent_change,
+                             panels['high_1d'][row], panels['low_1d'][row])
+
+    results = {}
+    for i, symbol in enumerate(stock_symbols):
+        # ta.bbands needs a full window before it returns bands at all
+        if count_1h[i] < max(BB_LENGTH, RSI_LENGTH):
+            print(f"Insufficient data for {symbol}, skipping...")
+            continue
+
+        indicators = {
+            'Bollinger_%b': bollinger_b[i],
+            'RSI': rsi[i],
+            'Value': value[i],
+        }
+        if not np.isnan(panels['day_high'][i]):
+            indicators['Day High'] = panels['day_high'][i]
+            indicators['Day Low'] = panels['day_low'][i]
+        for period_name, (enough, value_change, percent_change, high, low) in past.items():
+            if enough[i]:
+                indicators[f'Value change ({period_name})'] = value_change[i]
+                indicators[f'% change ({period_name})'] = percent_change[i]
+                indicators[f'High ({period_name} ago)'] = high[i]
+                indicators[f'Low ({period_name} ago)'] = low[i]
+        results[symbol] = indicators
+    return results
+
+
+def compute_results(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols, bollinger_data=None):
+    """bollinger_data: bars for the %b bands when they are not the hourly bars."""
+    panels = build_panels(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols)
+    bollinger_b = None
+    if bollinger_data is not None:
+        bollinger_b = latest_bollinger_b(build_panel(bollinger_data, stock_symbols)[0])
+    return results_from_panels(panels, stock_symbols, bollinger_b=bollinger_b)
@@ -0,0 +1,69 @@
+"""
+Deferred imports for the heavy analytics libraries.
+
+    pd = lazy_import('pandas')
+
+binds a module object whose code only runs on first attribute access, so
+importing app.py (or a process-pool worker) does not pay for pandas,
+yfinance or pandas_ta until something actually uses them. The module goes
+into sys.modules, so every later `import pandas` shares it.
+
+preload() finishes those imports on a background thread while the server
+binds. Python 3.11's LazyLoader has no lock of its own, so code that may
+touch the modules from another thread calls wait_for_preload() first.
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load(name):
+    """Run a lazily imported module's code now; returns the seconds it took."""
+    start = time.perf_counter()
+    # Any attribute access makes a lazy module execute
+    getattr(importlib.import_module(name), '__dict__')
+    return time.perf_counter() - start
+
+
+_preloaded = threading.Event()
+_preloaded.set()
+
+
+def wait_for_preload():
+    _preloaded.wait()
+
+
+def preload(names):
+    """Load the modules on a daemon thread and return the thread."""
+    _preloaded.clear()
+
+    def run():
+        try:
+            for name in names:
+                try:
+                    print(f"Loaded {name} in {load(name):.2f}s")
+                except Exception as e:
+                    print(f"Error preloading {name}: {e}")
+        finally:
+            _preloaded.set()
+
+    thread = threading.Thread(target=run, name='preload', daemon=True)
+    thread.start()
+    return thread
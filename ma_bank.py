@@ -0,0 +1,225 @@
+"""
+Shared-intermediate moving-average bank.
+
+calculate_moving_averages asks pandas_ta for ~29 averages of the same
+Close series, and most of them are built from the same few pieces. Here
+each piece is computed once for a whole (time x symbol) panel:
+
+- one EMA chain (e1..e6) gives EMA, DEMA, TEMA and T3, and ZLMA's EMA
+  rides along in the first pass
+- one rolling-mean pass gives SMA, MA_SMA and both halves of VWMA
+- the fixed-weight averages (WMA, FWMA, PWMA, SWMA, ALMA, LINREG, TRIMA,
+  SINWMA and HMA's inner WMAs) become a matmul of sliding windows
+  against a weight matrix, one matmul per window length
+- one rolling std of OHLC4 serves the %b of every average
+
+Values follow pandas_ta's definitions, including its quirks: an EMA of a
+series is seeded with the mean of the series' first `length` rows, NaNs
+skipped, and ALMA gives 0 and then NaN on its first two rows. Panels may
+carry NaN padding on top (indicator_engine.build_panel); each column's own
+first bar is treated as the start of its series.
+"""
+from math import comb, sqrt
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MA_LENGTH = 20
+BOLL_STD = 2
+
+ALMA_SIGMA = 6
+ALMA_OFFSET = 0.85
+SINWMA_LENGTH = 14
+T3_A = 0.7
+
+
+def _column(values):
+    values = np.asarray(values, dtype='float64')
+    return values[:, None] if values.ndim == 1 else values
+
+
+def series_start(values):
+    """Row of each column's first bar, len(values) for empty columns."""
+    present = ~np.isnan(values)
+    return np.where(present.any(axis=0), np.argmax(present, axis=0), len(values))
+
+
+def ta_ema(values, length, start):
+    # ta.ema: the mean of the series' first `length` rows, NaNs skipped, seeds row length-1
+    n_rows, n_cols = values.shape
+    seed_row = start + length - 1
+    seedable = seed_row < n_rows
+    present = ~np.isnan(values)
+    cumulative = np.vstack([np.zeros(n_cols), np.cumsum(np.where(present, values, 0.0), axis=0)])
+    counts = np.vstack([np.zeros(n_cols), np.cumsum(present, axis=0)])
+
+    cols = np.arange(n_cols)[seedable]
+    stop = seed_row[seedable] + 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        seed = ((cumulative[stop, cols] - cumulative[start[seedable], cols]) /
+                (counts[stop, cols] - counts[start[seedable], cols]))
+
+    rows = np.arange(n_rows)[:, None]
+    seeded = np.where(rows > seed_row, values, np.nan)
+    seeded[seed_row[seedable], cols] = seed
+    return pd.DataFrame(seeded).ewm(span=length, adjust=False).mean().to_numpy()
+
+
+def rolling_dot(values, weights):
+    """
+    Weighted sums over trailing windows for several weight vectors of one
+    length. weights is (length x k), oldest bar first; returns (k x time x
+    symbol), NaN until a full window of bars is available.
+    """
+    length, n_weights = weights.shape
+    n_rows, n_cols = values.shape
+    out = np.full((n_weights, n_rows, n_cols), np.nan)
+    if n_rows >= length:
+        windows = sliding_window_view(values, length, axis=0)  # (time, symbol, length)
+        out[:, length - 1:] = np.moveaxis(windows @ weights, -1, 0)
+    return out
+
+
+def linear_weights(length):
+    # ta.wma: 1..length, newest bar heaviest
+    weights = np.arange(1, length + 1, dtype='float64')
+    return weights / (0.5 * length * (length + 1))
+
+
+def pascal_weights(length):
+    triangle = np.array([comb(length - 1, i) for i in range(length)], dtype='float64')
+    return triangle / triangle.sum()
+
+
+def symmetric_triangle_weights(length):
+    if length == 2:
+        triangle = [1, 1]
+    elif length % 2 == 0:
+        front = list(range(1, length // 2 + 1))
+        triangle = front + front[::-1]
+    else:
+        front = list(range(1, (length + 1) // 2 + 1))
+        triangle = front + front[-2::-1]
+    triangle = np.array(triangle, dtype='float64')
+    return triangle / triangle.sum()
+
+
+def sine_weights(length):
+    sines = np.sin((np.arange(length) + 1) * np.pi / (length + 1))
+    return sines / sines.sum()
+
+
+def alma_weights(length, sigma=ALMA_SIGMA, offset=ALMA_OFFSET):
+    # ta.alma puts wtd[0] on the newest bar, so the window order is reversed
+    m = offset * (length - 1)
+    s = length / sigma
+    wtd = np.exp(-((np.arange(length) - m) ** 2) / (2 * s * s))
+    return (wtd / wtd.sum())[::-1]
+
+
+def linreg_weights(length):
+    # ta.linreg's fitted value at the newest bar, m * length + b, is linear in the window
+    x = np.arange(1, length + 1, dtype='float64')
+    x_sum = 0.5 * length * (length + 1)
+    x2_sum = x_sum * (2 * length + 1) / 3
+    divisor = length * x2_sum - x_sum * x_sum
+    return 1 / length + (length - x_sum / length) * (length * x - x_sum) / divisor
+
+
+def trima_weights(length):
+    # ta.trima is an SMA of an SMA; the two boxcars convolve to one triangle
+    half = round(0.5 * (length + 1))
+    return np.convolve(np.ones(half), np.ones(half)) / (half * half)
+
+
+def moving_averages(high, low, close, volume, length=MA_LENGTH):
+    """
+    The averages ma_bank covers, keyed like calculate_moving_averages,
+    each a (time x symbol) array. 1-D inputs are treated as one symbol.
+    """
+    high, low, close, volume = (_column(values) for values in (high, low, close, volume))
+    start = series_start(close)
+    n_rows = close.shape[0]
+    averages = {}
+
+    # Rolling means: SMA and both halves of VWMA in one pass
+    means = pd.DataFrame(np.hstack([close, close * volume, volume])).rolling(length, min_periods=length)
+    means = np.split(means.mean().to_numpy(), 3, axis=1)
+    averages['SMA'] = averages['MA_SMA'] = means[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        averages['VWMA'] = means[1] / means[2]
+
+    highest = pd.DataFrame(np.hstack([close, high])).rolling(length, min_periods=length).max().to_numpy()
+    lowest = pd.DataFrame(np.hstack([close, low])).rolling(length, min_periods=length).min().to_numpy()
+    highest, high_max = np.split(highest, 2, axis=1)
+    lowest, low_min = np.split(lowest, 2, axis=1)
+    averages['MIDPOINT'] = 0.5 * (lowest + highest)
+    averages['MIDPRICE'] = 0.5 * (low_min + high_max)
+
+    averages['RMA'] = pd.DataFrame(close).ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+
+    # EMA chain; ZLMA's de-lagged close shares the first pass
+    lag = int(0.5 * (length - 1))
+    lagged = np.full_like(close, np.nan)
+    lagged[lag:] = close[:-lag] if lag else close
+    delagged = 2 * close - lagged
+    first = ta_ema(np.hstack([close, delagged]), length, np.concatenate([start, start]))
+    e1, averages['ZLMA'] = np.split(first, 2, axis=1)
+    chain = [e1]
+    for _ in range(5):
+        chain.append(ta_ema(chain[-1], length, start))
+    e1, e2, e3, e4, e5, e6 = chain
+    averages['EMA'] = e1
+    averages['DEMA'] = 2 * e1 - e2
+    averages['TEMA'] = 3 * (e1 - e2) + e3
+    a = T3_A
+    c1 = -a * a * a
+    c2 = 3 * a * a + 3 * a * a * a
+    c3 = -6 * a * a - 3 * a - 3 * a * a * a
+    c4 = a * a * a + 3 * a * a + 3 * a + 1
+    averages['T3'] = c1 * e6 + c2 * e5 + c3 * e4 + c4 * e3
+
+    # Fixed-weight averages, one matmul per window length
+    weighted = {'WMA': linear_weights(length), 'PWMA': pascal_weights(length),
+                'SWMA': symmetric_triangle_weights(length), 'ALMA': alma_weights(length),
+                'LINREG': linreg_weights(length)}
+    for name, values in zip(weighted, rolling_dot(close, np.column_stack(list(weighted.values())))):
+        averages[name] = values
+    averages['FWMA'] = averages['WMA']
+    averages['TRIMA'] = rolling_dot(close, trima_weights(length)[:, None])[0]
+    averages['SINWMA'] = rolling_dot(close, sine_weights(SINWMA_LENGTH)[:, None])[0]
+
+    # ta.alma leaves 0 on the series' row length-1 and NaN on row length
+    cols = np.arange(close.shape[1])
+    for row, fill in ((start + length - 1, 0.0), (start + length, np.nan)):
+        inside = row < n_rows
+        averages['ALMA'][row[inside], cols[inside]] = fill
+
+    half_length = int(length / 2)
+    sqrt_length = int(sqrt(length))
+    wma_half = rolling_dot(close, linear_weights(half_length)[:, None])[0]
+    averages['HMA'] = rolling_dot(2 * wma_half - averages['WMA'],
+                                  linear_weights(sqrt_length)[:, None])[0]
+
+    averages['WCP'] = (high + low + 2 * close) / 4
+    return averages
+
+
+def rolling_std(ohlc4, length=MA_LENGTH):
+    # The sample std calculate_bollinger_percentages has always used
+    return pd.DataFrame(_column(ohlc4)).rolling(window=length).std().to_numpy()
+
+
+def percent_b(ohlc4, averages, std_dev, std=BOLL_STD):
+    """
+    %b of OHLC4 against bands of +/- std * std_dev around each average.
+    averages is (k x time x symbol) or (k x time); the result has its shape.
+    """
+    averages = np.asarray(averages, dtype='float64')
+    ohlc4 = np.asarray(ohlc4, dtype='float64').reshape(averages.shape[1:])
+    std_dev = np.asarray(std_dev, dtype='float64').reshape(averages.shape[1:])
+    upper_band = averages + std * std_dev
+    lower_band = averages - std * std_dev
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((ohlc4 - lower_band) / (upper_band - lower_band)) * 100
@@ -0,0 +1,102 @@
+"""
+NSE trading session calendar and a multi-cadence refresh scheduler.
+
+Each data interval gets its own cadence: minute bars every minute during
+the session, hourly bars right after each hourly bar closes, and daily
+bars once after the close. Outside the session nothing is due.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+import lazy_imports
+
+pd = lazy_imports.lazy_import('pandas')
+
+MARKET_TZ = 'Asia/Kolkata'
+SESSION_OPEN = (9, 15)
+SESSION_CLOSE = (15, 30)
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nse_holidays.txt')
+
+# Wait a little after a bar closes so yfinance has published it
+PUBLISH_DELAY = timedelta(seconds=5)
+MINUTE_CADENCE = timedelta(minutes=1)
+HOURLY_BAR = timedelta(hours=1)
+DAILY_DELAY = timedelta(minutes=15)
+
+
+def load_holidays(path=HOLIDAY_FILE):
+    holidays = set()
+    if not os.path.exists(path):
+        print(f"Holiday file {path} not found, only weekends are treated as closed.")
+        return holidays
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                holidays.add(datetime.strptime(line, '%Y-%m-%d').date())
+    return holidays
+
+
+def now_market():
+    return pd.Timestamp.now(tz=MARKET_TZ)
+
+
+def is_trading_day(day, holidays):
+    return day.weekday() < 5 and day not in holidays
+
+
+def session_bounds(day):
+    base = pd.Timestamp(day).tz_localize(MARKET_TZ)
+    return (base + timedelta(hours=SESSION_OPEN[0], minutes=SESSION_OPEN[1]),
+            base + timedelta(hours=SESSION_CLOSE[0], minutes=SESSION_CLOSE[1]))
+
+
+def due_times(interval, day):
+    """All refresh times for one interval on one trading day."""
+    session_open, session_close = session_bounds(day)
+    if interval == '1m':
+        # Every minute bar up to and including the one ending at the close
+        times = pd.date_range(session_open + MINUTE_CADENCE, session_close, freq=MINUTE_CADENCE)
+        return [t + PUBLISH_DELAY for t in times]
+    if interval == '1h':
+        # Hourly bars run 9:15-10:15, ... and the last one is cut short at 15:30
+        closes = list(pd.date_range(session_open + HOURLY_BAR, session_close, freq=HOURLY_BAR))
+        if not closes or closes[-1] != session_close:
+            closes.append(session_close)
+        return [t + PUBLISH_DELAY for t in closes]
+    if interval == '1d':
+        return [session_close + DAILY_DELAY]
+    raise ValueError(f"No cadence defined for interval {interval}")
+
+
+def next_run(interval, after, holidays, max_days=15):
+    day = after.date()
+    for _ in range(max_days):
+        if is_trading_day(day, holidays):
+            for due in due_times(interval, day):
+                if due > after:
+                    return due
+        day += timedelta(days=1)
+    # No trading day in sight (e.g. an outdated holiday file), check back tomorrow
+    return after + timedelta(days=1)
+
+
+class MarketScheduler:
+    def __init__(self, intervals=('1m', '1h', '1d'), holidays=None):
+        self.holidays = load_holidays() if holidays is None else holidays
+        now = now_market()
+        self.next_due = {interval: next_run(interval, now, self.holidays) for interval in intervals}
+
+    def wait_for_due(self, sleep=time.sleep):
+        """Sleep until the next refresh is due and return the intervals due now."""
+        due_at = min(self.next_due.values())
+        delay = (due_at - now_market()).total_seconds()
+        if delay > 0:
+            sleep(delay)
+
+        now = now_market()
+        due = {interval for interval, at in self.next_due.items() if at <= now}
+        for interval in due:
+            self.next_due[interval] = next_run(interval, now, self.holidays)
+        return due
@@ -0,0 +1,109 @@
+"""
+Message queue plumbing for running the server as one compute worker plus
+any number of web processes (see ROLE in app.py).
+
+Two channels share the same broker:
+
+- SOCKETIO_CHANNEL is Flask-SocketIO's own message queue, so an emit to a
+  client's sid reaches that client from whichever process sends it.
+- BUS_CHANNEL carries the worker <-> web messages, as
+  {'kind': ..., 'sender': ..., 'payload': ...} JSON:
+
+      state     worker -> web   a StateStore.export(), for StateStore.apply()
+      resync    web -> worker   ask for a full export
+      refresh   web -> worker   a client's refresh request
+
+The broker is picked from the URL the way Flask-SocketIO does it
+(redis://, amqp:// and anything else kombu knows), plus 'local://', an
+in-process stand-in for tests and for trying the split on one machine
+without a broker: every manager in the process subscribed to a channel
+receives what any of them publishes.
+"""
+import json
+import queue
+import threading
+import uuid
+
+import socketio
+
+SOCKETIO_CHANNEL = 'flask-socketio'
+BUS_CHANNEL = 'stock-monitor-bus'
+
+_local_lock = threading.Lock()
+_local_subscribers = {}  # channel -> subscriber queues
+
+
+class LocalManager(socketio.PubSubManager):
+    """In-process pub/sub manager for 'local://' URLs."""
+    name = 'local'
+
+    def __init__(self, url='local://', channel='socketio', write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.messages = None
+        if not write_only:
+            # Subscribed straight away, so nothing published after construction is missed
+            self.messages = queue.Queue()
+            with _local_lock:
+                _local_subscribers.setdefault(channel, []).append(self.messages)
+
+    def _publish(self, data):
+        message = self.json.dumps(data)
+        with _local_lock:
+            subscribers = list(_local_subscribers.get(self.channel, ()))
+        for messages in subscribers:
+            messages.put(message)
+
+    def _listen(self):
+        while True:
+            yield self.messages.get()
+
+
+def queue_manager(url, channel, write_only=False):
+    if url.startswith('local://'):
+        manager_class = LocalManager
+    elif url.startswith(('redis://', 'rediss://')):
+        manager_class = socketio.RedisManager
+    else:
+        manager_class = socketio.KombuManager
+    return manager_class(url, channel=channel, write_only=write_only)
+
+
+def socketio_options(url):
+    """SocketIO(app, **options) keyword arguments for the message queue at url, if any."""
+    if not url:
+        return {}
+    return {'client_manager': queue_manager(url, SOCKETIO_CHANNEL)}
+
+
+class MessageBus:
+    """Typed messages between the processes; a process never receives its own."""
+
+    def __init__(self, url, channel=BUS_CHANNEL):
+        self.queue = queue_manager(url, channel)
+        self.sender = uuid.uuid4().hex
+        self.handlers = {}
+
+    def on(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def publish(self, kind, payload=None):
+        self.queue._publish({'kind': kind, 'sender': self.sender, 'payload': payload})
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='message-bus', daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        # Handlers run one at a time in arrival order; slow ones start their own thread
+        for message in self.queue._listen():
+            try:
+                if not isinstance(message, dict):
+                    message = json.loads(message)
+                if message.get('sender') == self.sender:
+                    continue
+                handler = self.handlers.get(message.get('kind'))
+                if handler is not None:
+                    handler(message.get('payload'))
+            except Exception as e:
+                print(f"Error handling bus message: {e}")
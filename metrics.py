@@ -0,0 +1,125 @@
+"""
+In-process latency histograms and counters in Prometheus text format.
+
+    with metrics.FETCH_SECONDS.time():
+        ...
+    metrics.SYMBOLS_SKIPPED.inc(3, reason='insufficient_data')
+
+render() returns the exposition text served by the /metrics route.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_metrics = []
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        with _lock:
+            _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_label_text(key)} {_format(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.series = {}   # labels -> [bucket counts, sum, count]
+        with _lock:
+            _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for key, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = key + (('le', _format(bound)),)
+                lines.append(f'{self.name}_bucket{_label_text(bucket_labels)} {cumulative}')
+            lines.append(f'{self.name}_sum{_label_text(key)} {_format(total)}')
+            lines.append(f'{self.name}_count{_label_text(key)} {count}')
+        return lines
+
+
+def render():
+    with _lock:
+        lines = []
+        for metric in _metrics:
+            lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+FETCH_SECONDS = Histogram('stock_fetch_seconds', 'Wall time fetching a cycle\'s bars; in pipelined cycles, until the '
+                                                 'last chunk\'s bars are in, overlapping with compute.')
+PROCESS_SECONDS = Histogram('stock_process_seconds', 'Time spent computing indicators for the universe per cycle, '
+                                                     'summed over the chunks of a pipelined cycle.')
+INDICATOR_CALL_SECONDS = Histogram('stock_indicator_call_seconds',
+                                   'Time per calculate_bollinger_and_rsi call.')
+EMIT_SECONDS = Histogram('stock_emit_seconds', 'Time spent emitting a cycle\'s alerts, summed over the chunks '
+                                               'of a pipelined cycle.')
+FIRST_EMIT_SECONDS = Histogram('stock_first_emit_seconds', 'Time from the start of a pipelined cycle to its first emit.')
+LOCK_WAIT_SECONDS = Histogram('stock_lock_wait_seconds', 'Time spent waiting for data_processing_lock.')
+FETCH_CHUNK_SECONDS = Histogram('stock_fetch_chunk_seconds', 'Time per fetch_executor chunk, retries included.')
+FETCH_RETRIES = Counter('stock_fetch_retries_total', 'Chunk download attempts retried by reason.')
+FETCH_HEDGES = Counter('stock_fetch_hedges_total', 'Lagging chunk downloads issued a second time.')
+FETCH_CHUNKS_FAILED = Counter('stock_fetch_chunks_failed_total', 'Chunks left out of a cycle after all retries.')
+CYCLES = Counter('stock_cycles_total', 'Completed fetch/compute cycles by outcome.')
+SYMBOLS_SKIPPED = Counter('stock_symbols_skipped_total', 'Symbols left out of a cycle by reason.')
+SYMBOLS_FAILED = Counter('stock_symbols_failed_total', 'Symbols whose indicator computation raised.')
+BUS_MESSAGES = Counter('stock_bus_messages_total', 'Worker/web message bus traffic by kind and direction.')
@@ -6,6 +6,11 @@ import logging
 import warnings
 from urllib3.exceptions import NotOpenSSLWarning
 
+import ma_bank
+
+# 'bank' computes the shared-intermediate averages in ma_bank, 'pandas_ta' calls pandas_ta for every one
+MA_ENGINE = 'bank'
+
 # Suppress the NotOpenSSLWarning
 warnings.filterwarnings("ignore", category=NotOpenSSLWarning)
 
@@ -19,6 +24,21 @@ logging.basicConfig(
     ]
 )
 
+def pandas_ta_only_indicators(stock_data):
+    """
+    The indicators ma_bank does not cover: recursive filters and ones with
+    their own column sets.
+    """
+    return {
+        'HILO': ta.hilo(stock_data['High'], stock_data['Low'], stock_data['Close'], length=13),
+        'HWMA': ta.hwma(stock_data['Close'], length=20),
+        'KAMA': ta.kama(stock_data['Close'], length=20, fast=2, slow=30),
+        'SSF': ta.ssf(stock_data['Close'], length=20),
+        'SUPERTREND': ta.supertrend(stock_data['High'], stock_data['Low'], stock_data['Close']),
+        'VIDYA': ta.vidya(stock_data['Close'], length=20, alpha=0.2),
+        'VWAP': ta.vwap(stock_data['High'], stock_data['Low'], stock_data['Close'], stock_data['Volume']),
+    }
+
 def calculate_moving_averages(stock_data):
     """
     Calculate various moving averages and add them to the stock_data DataFrame.
@@ -28,8 +48,30 @@ def calculate_moving_averages(stock_data):
         stock_data['OHLC4'] = (stock_data['Open'] + stock_data['High'] +
                                stock_data['Low'] + stock_data['Close']) / 4
 
+    if MA_ENGINE == 'bank':
+        averages = ma_bank.moving_averages(stock_data['High'], stock_data['Low'],
+                                           stock_data['Close'], stock_data['Volume'])
+        indicators = {name: pd.Series(values[:, 0], index=stock_data.index) for name, values in averages.items()}
+        indicators['OHLC4'] = stock_data['OHLC4']
+        indicators.update(pandas_ta_only_indicators(stock_data))
+        # Same (alphabetical) order as the pandas_ta list below
+        indicators = dict(sorted(indicators.items()))
+    else:
+        indicators = pandas_ta_indicators(stock_data)
+
+    # Add indicators to the DataFrame
+    for name, indicator in indicators.items():
+        if isinstance(indicator, pd.DataFrame):
+            for col in indicator.columns:
+                stock_data[f"{name}_{col}"] = indicator[col]
+        else:
+            stock_data[name] = indicator
+
+    return stock_data, indicators
+
+def pandas_ta_indicators(stock_data):
     # List of moving averages and indicators to calculate
-    indicators = {
+    return {
         'ALMA': ta.alma(stock_data['Close'], length=20, sigma=6, offset=0.85),
         'DEMA': ta.dema(stock_data['Close'], length=20),
         'EMA': ta.ema(stock_data['Close'], length=20),
@@ -61,39 +103,31 @@ def calculate_moving_averages(stock_data):
         'ZLMA': ta.zlma(stock_data['Close'], length=20),
     }
 
-    # Add indicators to the DataFrame
-    for name, indicator in indicators.items():
-        if isinstance(indicator, pd.DataFrame):
-            for col in indicator.columns:
-                stock_data[f"{name}_{col}"] = indicator[col]
-        else:
-            stock_data[name] = indicator
-
-    return stock_data, indicators
-
 def calculate_bollinger_percentages(stock_data, indicators):
-    bollinger_percentages = {}
-    for name, indicator in indicators.items():
-        length = 20  # Adjust if needed
-        std_dev = stock_data['OHLC4'].rolling(window=length).std()
+    length = 20  # Adjust if needed
+    # One std for every indicator, and one %b pass over all of them
+    std_dev = ma_bank.rolling_std(stock_data['OHLC4'], length)[:, 0]
 
+    labels = []
+    columns = []
+    for name, indicator in indicators.items():
         if isinstance(indicator, pd.Series):
-            upper_band = indicator + 2 * std_dev
-            lower_band = indicator - 2 * std_dev
-            bollinger_b = ((stock_data['OHLC4'] - lower_band) / (upper_band - lower_band)) * 100
-            stock_data[f'Boll_%b_{name}'] = bollinger_b
-            bollinger_percentages[name] = bollinger_b.iloc[-1]
+            labels.append(name)
+            columns.append(indicator.reindex(stock_data.index).to_numpy(dtype='float64'))
         elif isinstance(indicator, pd.DataFrame):
             for col in indicator.columns:
-                series = indicator[col]
-                upper_band = series + 2 * std_dev
-                lower_band = series - 2 * std_dev
-                bollinger_b = ((stock_data['OHLC4'] - lower_band) / (upper_band - lower_band)) * 100
-                stock_data[f'Boll_%b_{name}_{col}'] = bollinger_b
-                bollinger_percentages[f'{name}_{col}'] = bollinger_b.iloc[-1]
+                labels.append(f'{name}_{col}')
+                columns.append(indicator[col].reindex(stock_data.index).to_numpy(dtype='float64'))
         else:
             continue  # Skip if indicator is neither Series nor DataFrame
 
+    if not labels:
+        return stock_data, {}
+    bollinger_b = ma_bank.percent_b(stock_data['OHLC4'].to_numpy(dtype='float64'), np.stack(columns), std_dev)
+    boll_frame = pd.DataFrame(bollinger_b.T, index=stock_data.index, columns=[f'Boll_%b_{label}' for label in labels])
+    stock_data = pd.concat([stock_data, boll_frame], axis=1)
+    bollinger_percentages = dict(zip(labels, bollinger_b[:, -1]))
+
     return stock_data, bollinger_percentages
 
 def print_moving_averages(stock_data, bollinger_percentages):
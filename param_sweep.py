@@ -0,0 +1,201 @@
+"""
+Parameter sweep for the alert indicators.
+
+Evaluates a grid of Bollinger lengths, std multipliers, mamodes and RSI
+lengths over the stored history of every symbol, and reports how often the
+collect_alerts thresholds would have fired with each parameter set and how
+the price moved afterwards.
+
+Work is shared across the grid:
+- OHLC4 and its gains/losses are computed once.
+- Rolling means and population stds for every Bollinger length come from
+  one pair of cumulative sums.
+- One EMA pass per length serves every std multiplier.
+- %b for all multipliers is a cheap rescale of the same mid and std.
+- The %b and RSI rules fire independently, so statistics are computed per
+  Bollinger setting and per RSI length, then added up for each
+  combination.
+
+All parameter sets are scored on the same bars: those after the longest
+window in the grid has filled.
+
+    python param_sweep.py --interval 1h --csv sweep.csv
+    python param_sweep.py --bb-lengths 60 120 --stds 2 2.5 --rsi-lengths 14 20
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import bar_store
+import indicator_engine
+import symbol_registry
+import universe
+
+SWEEP_BB_LENGTHS = (20, 50, 80, 120, 160, 200)
+SWEEP_STDS = (1.5, 2, 2.5, 3)
+SWEEP_MAMODES = ('ema', 'sma')
+SWEEP_RSI_LENGTHS = (7, 14, 20, 28)
+
+# Bars ahead used to judge an alert: about a day on hourly bars, a week on daily
+SWEEP_FORWARD_BARS = {'1h': 7, '1d': 5}
+
+# Oversold alerts expect a rise, overbought ones a fall
+ALERT_DIRECTION = {'green': 1, 'blue': 1, 'red': -1, 'orange': -1}
+
+
+def rolling_moments(values, lengths):
+    """Rolling mean and population std for every length from one set of cumulative sums."""
+    n_rows, n_cols = values.shape
+    present = ~np.isnan(values)
+    # Shifting each column by its first bar keeps the sums small and the variance accurate
+    first = np.where(present.any(axis=0), np.argmax(present, axis=0), 0)
+    shift = values[first, np.arange(n_cols)]
+    shift = np.where(np.isnan(shift), 0.0, shift)
+    centered = np.where(present, values - shift, 0.0)
+    zeros = np.zeros((1, n_cols))
+    sums = np.vstack([zeros, np.cumsum(centered, axis=0)])
+    squares = np.vstack([zeros, np.cumsum(centered * centered, axis=0)])
+    counts = np.vstack([zeros, np.cumsum(present, axis=0)])
+
+    moments = {}
+    for length in lengths:
+        mean = np.full((n_rows, n_cols), np.nan)
+        std = np.full((n_rows, n_cols), np.nan)
+        if n_rows >= length:
+            window_sum = sums[length:] - sums[:-length]
+            window_squares = squares[length:] - squares[:-length]
+            full = (counts[length:] - counts[:-length]) == length
+            window_mean = window_sum / length
+            variance = np.maximum(window_squares / length - window_mean * window_mean, 0.0)
+            mean[length - 1:] = np.where(full, window_mean + shift, np.nan)
+            std[length - 1:] = np.where(full, np.sqrt(variance), np.nan)
+        moments[length] = (mean, std)
+    return moments
+
+
+def rsi_panels(values, lengths):
+    change = np.diff(values, axis=0, prepend=np.nan)
+    gains = pd.DataFrame(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)))
+    losses = pd.DataFrame(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)))
+    panels = {}
+    for length in lengths:
+        avg_gain = gains.ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+        avg_loss = losses.ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            panels[length] = 100 * avg_gain / (avg_gain + avg_loss)
+    return panels
+
+
+def rule_stats(values, rules, scored, forward_return):
+    """Alert hits, episodes and forward-return outcomes for one indicator setting."""
+    types = np.where(scored, backtest.rule_types(values, rules), -1)
+    stats = {'alerts': 0, 'episodes': 0, 'judged': 0, 'successes': 0, 'signed_return': 0.0}
+    for type_index, (alert_type, _, _) in enumerate(rules):
+        hits = types == type_index
+        n_hits = int(hits.sum())
+        if n_hits == 0:
+            continue
+        stats['alerts'] += n_hits
+        stats['episodes'] += int((hits[1:] & ~hits[:-1]).sum() + hits[0].sum())
+        outcome = ALERT_DIRECTION[alert_type] * forward_return[hits]
+        outcome = outcome[~np.isnan(outcome)]
+        stats['judged'] += len(outcome)
+        stats['successes'] += int((outcome > 0).sum())
+        stats['signed_return'] += float(outcome.sum())
+    return stats
+
+
+def sweep(stock_data, stock_symbols, interval='1h', bb_lengths=SWEEP_BB_LENGTHS, stds=SWEEP_STDS,
+          mamodes=SWEEP_MAMODES, rsi_lengths=SWEEP_RSI_LENGTHS):
+    panels, counts = indicator_engine.build_panel(stock_data, stock_symbols)
+    ohlc4 = indicator_engine.ohlc4_panel(panels)
+    close = panels['Close']
+    n_rows = ohlc4.shape[0]
+
+    # Score every parameter set on the bars where the longest window is full
+    rows = np.arange(n_rows)[:, None]
+    scored = rows >= n_rows - counts + max(max(bb_lengths), max(rsi_lengths)) - 1
+
+    horizon = SWEEP_FORWARD_BARS[interval]
+    forward_return = np.full(close.shape, np.nan)
+    if n_rows > horizon:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            forward_return[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+
+    moments = rolling_moments(ohlc4, bb_lengths)
+    bb_stats = {}
+    for length in bb_lengths:
+        mean, std = moments[length]
+        for mamode in mamodes:
+            mid = indicator_engine.ema_panel(ohlc4, length) if mamode == 'ema' else mean
+            for multiplier in stds:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    percent_b = (ohlc4 - (mid - multiplier * std)) / (2 * multiplier * std) * 100
+                bb_stats[length, multiplier, mamode] = rule_stats(percent_b, backtest.BOLLINGER_RULES,
+                                                                  scored, forward_return)
+
+    rsi_stats = {length: rule_stats(rsi, backtest.RSI_RULES, scored, forward_return)
+                 for length, rsi in rsi_panels(ohlc4, rsi_lengths).items()}
+
+    scored_bars = int(scored.sum())
+    rows_out = []
+    for (length, multiplier, mamode), rsi_length in itertools.product(bb_stats, rsi_lengths):
+        bb, rsi = bb_stats[length, multiplier, mamode], rsi_stats[rsi_length]
+        alerts = bb['alerts'] + rsi['alerts']
+        judged = bb['judged'] + rsi['judged']
+        rows_out.append({
+            'bb_length': length,
+            'std': multiplier,
+            'mamode': mamode,
+            'rsi_length': rsi_length,
+            'scored_bars': scored_bars,
+            'bollinger_alerts': bb['alerts'],
+            'rsi_alerts': rsi['alerts'],
+            'alerts_per_1000_bars': alerts / scored_bars * 1000 if scored_bars else np.nan,
+            'episodes': bb['episodes'] + rsi['episodes'],
+            'hit_rate': (bb['successes'] + rsi['successes']) / judged if judged else np.nan,
+            'mean_signed_return': (bb['signed_return'] + rsi['signed_return']) / judged if judged else np.nan,
+        })
+    return pd.DataFrame(rows_out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep Bollinger/RSI parameters over stored history.")
+    parser.add_argument('--symbols', nargs='+', help="defaults to the watch list in universe.json")
+    parser.add_argument('--interval', default='1h', choices=list(backtest.BACKTEST_PERIODS))
+    parser.add_argument('--bb-lengths', type=int, nargs='+', default=list(SWEEP_BB_LENGTHS))
+    parser.add_argument('--stds', type=float, nargs='+', default=list(SWEEP_STDS))
+    parser.add_argument('--mamodes', nargs='+', default=list(SWEEP_MAMODES), choices=['ema', 'sma'])
+    parser.add_argument('--rsi-lengths', type=int, nargs='+', default=list(SWEEP_RSI_LENGTHS))
+    parser.add_argument('--update', action='store_true', help="bring the bar store up to date first")
+    parser.add_argument('--csv', help="write the full grid to this file")
+    args = parser.parse_args()
+
+    stock_symbols = args.symbols or symbol_registry.filter_valid(universe.symbols('watch'))
+    period = backtest.BACKTEST_PERIODS[args.interval]
+    if args.update:
+        stock_data = bar_store.update_bars(stock_symbols, period=period, interval=args.interval)
+    else:
+        stock_data = bar_store.read_bars(stock_symbols, period=period, interval=args.interval)
+
+    start = time.perf_counter()
+    results = sweep(stock_data, stock_symbols, args.interval, args.bb_lengths, args.stds, args.mamodes,
+                    args.rsi_lengths)
+    elapsed = time.perf_counter() - start
+
+    if args.csv:
+        results.to_csv(args.csv, index=False)
+    if results.empty or results['scored_bars'].iloc[0] == 0:
+        print(f"Not enough {args.interval} history for the longest window in the grid")
+    else:
+        with pd.option_context('display.max_rows', 40, 'display.width', 200):
+            print(results.sort_values('hit_rate', ascending=False).to_string(index=False, max_rows=40))
+    print(f"\nSwept {len(results)} parameter sets over {len(stock_symbols)} symbols in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Chunked fetch stage for pipelined cycles.
+
+stream_chunks splits the symbols into chunks and fetches every
+(chunk, interval) pair on a thread pool, chunk by chunk, so the 1h, 1d and
+1m downloads of a chunk run side by side. A chunk is yielded as soon as all
+of its intervals are in, while later chunks are still downloading, so the
+caller can compute and emit it without waiting for the whole universe:
+
+    for chunk, frames in pipeline.stream_chunks(symbols, ['1h', '1d', '1m'], fetch):
+        results = compute(chunk, frames)   # overlaps with the remaining fetches
+        emit(results)
+
+The network limits themselves (request slots, rate limit, retries) are
+fetch_executor's; this module only decides what is fetched together.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import fetch_executor
+
+# One download request per chunk and interval, as in a staged cycle
+PIPELINE_CHUNK_SIZE = fetch_executor.FETCH_CHUNK_SIZE
+PIPELINE_WORKERS = 6
+
+
+def stream_chunks(stock_symbols, intervals, fetch, chunk_size=PIPELINE_CHUNK_SIZE, workers=PIPELINE_WORKERS):
+    """
+    Call fetch(chunk, interval) for every chunk and interval and yield
+    (chunk, {interval: result}) in completion order. A fetch that raises
+    is reported and its result is None.
+    """
+    stock_symbols = list(stock_symbols)
+    chunks = [stock_symbols[i:i + chunk_size] for i in range(0, len(stock_symbols), chunk_size)]
+    if not chunks or not intervals:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline')
+    try:
+        # Submitted chunk by chunk, so the first chunk's intervals are fetched first
+        owners = {}
+        for index, chunk in enumerate(chunks):
+            for interval in intervals:
+                owners[pool.submit(fetch, chunk, interval)] = (index, interval)
+
+        frames = {index: {} for index in range(len(chunks))}
+        pending = set(owners)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, interval = owners[future]
+                try:
+                    frames[index][interval] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {interval} bars for {len(chunks[index])} symbols "
+                          f"starting at {chunks[index][0]}: {e}")
+                    frames[index][interval] = None
+                if len(frames[index]) == len(intervals):
+                    yield chunks[index], frames.pop(index)
+    finally:
+        # A consumer that stops early does not wait for the remaining downloads
+        pool.shutdown(wait=False, cancel_futures=True)
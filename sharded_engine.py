@@ -0,0 +1,133 @@
+"""
+Process-pool sharding for the panel indicator engine.
+
+The aligned (time x symbol) panels are copied once into shared memory;
+each worker attaches to the same blocks, computes indicators for its
+slice of symbol columns and sends back only the small per-symbol result
+dicts, which are merged in symbol order before alert evaluation.
+
+A spawned worker imports the parent's __main__ script as __mp_main__
+before its first task, as multiprocessing does for any script; app.py
+skips its broker connections and universe load when imported that way.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, resource_tracker, shared_memory
+
+import numpy as np
+
+import indicator_engine
+
+INDICATOR_WORKERS = os.cpu_count() or 1
+
+# Below this many symbols per worker the pool overhead outweighs the work
+MIN_SYMBOLS_PER_SHARD = 16
+
+_pool = None
+_pool_workers = None
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # Spawned workers do not inherit the web server's threads and locks
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _share_panels(panels):
+    blocks = []
+    specs = {}
+    for name, array in panels.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def _attach(block_name):
+    # The parent creates and unlinks every block; a worker that kept the
+    # blocks it attaches to registered would have them reported as leaked,
+    # or unlinked, on exit
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=block_name, track=False)
+    block = shared_memory.SharedMemory(name=block_name)
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def _compute_shard(specs, symbols, start, stop):
+    blocks = []
+    panels = {}
+    try:
+        for name, (block_name, shape, dtype) in specs.items():
+            block = _attach(block_name)
+            blocks.append(block)
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            # Copy the shard's columns out so no view outlives the block
+            panels[name] = np.array(array[..., start:stop])
+            del array
+        return indicator_engine.results_from_panels(panels, symbols, bollinger_b=panels.pop('bollinger_b', None),
+                                                    value=panels.pop('value', None))
+    finally:
+        panels.clear()
+        for block in blocks:
+            block.close()
+
+
+def compute_results(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols, bollinger_data=None,
+                    workers=INDICATOR_WORKERS):
+    """bollinger_data: bars for the %b bands when they are not the hourly bars."""
+    panels = indicator_engine.build_panels(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols)
+    bollinger_b = None
+    if bollinger_data is not None:
+        bollinger_b = indicator_engine.latest_bollinger_b(indicator_engine.build_panel(bollinger_data, stock_symbols)[0])
+    return results_from_panels(panels, stock_symbols, workers, bollinger_b=bollinger_b)
+
+
+def results_from_panels(panels, stock_symbols, workers=INDICATOR_WORKERS, bollinger_b=None, value=None):
+    """
+    bollinger_b: the latest %b per symbol when it comes from another
+    timeframe; value: the latest price per symbol when it is newer than
+    the last hourly close.
+    """
+    shards = min(workers, max(1, len(stock_symbols) // MIN_SYMBOLS_PER_SHARD))
+    if shards <= 1:
+        return indicator_engine.results_from_panels(panels, stock_symbols, bollinger_b=bollinger_b, value=value)
+
+    bounds = np.linspace(0, len(stock_symbols), shards + 1).astype(int)
+    # Sliced by symbol column like the panels
+    if bollinger_b is not None:
+        panels = dict(panels, bollinger_b=bollinger_b)
+    if value is not None:
+        panels = dict(panels, value=value)
+    blocks, specs = _share_panels(panels)
+    try:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_compute_shard, specs, stock_symbols[start:stop], start, stop)
+                   for start, stop in zip(bounds[:-1], bounds[1:])]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+            if sys.version_info < (3, 13):
+                # Spawned workers share this process's resource tracker, so a
+                # worker's unregister above also dropped the parent's entry
+                resource_tracker.register(block._name, 'shared_memory')
+            block.unlink()
@@ -0,0 +1,47 @@
+"""
+Single-flight call coalescing.
+
+While a call is in flight, further callers do not start their own; they
+wait for the running one and receive its result (or its exception).
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.call = None
+
+    def in_flight(self):
+        return self.call is not None
+
+    def do(self, fn):
+        with self.lock:
+            call = self.call
+            leader = call is None
+            if leader:
+                call = self.call = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.call = None
+            call.done.set()
+        return call.result
@@ -0,0 +1,120 @@
+"""
+Warm-start snapshots of the server's in-memory state.
+
+A snapshot is a directory under data/snapshot/ holding:
+
+    meta.json                      format version, write time, symbol order, buffer layout
+    <interval>_timestamps.npy      (symbol x capacity) int64 ring slots
+    <interval>_values.npy          (symbol x field x capacity) bar values
+    <interval>_cursor.npy          (symbol x 2) ring size and head
+    state.pickle                   last results, streaming indicator state, intraday state
+
+The ring arrays are plain .npy files so load_snapshot can memory-map them
+copy-on-write: every restored ring buffer is a view into the mapping, pages
+are read only when touched, and later writes stay private to the process.
+
+Snapshots are written to a fresh directory and then published by rewriting
+the CURRENT pointer file, so a crash mid-write never leaves a torn snapshot.
+"""
+import json
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+
+import bar_buffers
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'snapshot')
+SNAPSHOT_VERSION = 2
+
+_CURRENT = 'CURRENT'
+
+
+def write_snapshot(universe_bars, state, snapshot_dir=None):
+    """
+    Write the ring buffers of every symbol and a picklable state dict.
+    Returns the published snapshot's path.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+    name = f'snapshot-{time.time_ns()}'
+    path = os.path.join(snapshot_dir, name)
+    os.makedirs(path)
+
+    symbols = list(universe_bars.symbols)
+    layout = {}
+    for interval, capacity in bar_buffers.BAR_CAPACITY.items():
+        timestamps = np.zeros((len(symbols), capacity), dtype=np.int64)
+        values = np.full((len(symbols), len(bar_buffers.BAR_FIELDS), capacity), np.nan, dtype=universe_bars.dtype)
+        cursor = np.zeros((len(symbols), 2), dtype=np.int64)
+        for i, symbol in enumerate(symbols):
+            buffer = universe_bars.symbols[symbol].buffers[interval]
+            timestamps[i] = buffer.timestamps
+            values[i] = buffer.values
+            cursor[i] = (buffer.size, buffer.head)
+        np.save(os.path.join(path, f'{interval}_timestamps.npy'), timestamps)
+        np.save(os.path.join(path, f'{interval}_values.npy'), values)
+        np.save(os.path.join(path, f'{interval}_cursor.npy'), cursor)
+        layout[interval] = {'capacity': capacity, 'dtype': np.dtype(universe_bars.dtype).str}
+
+    with open(os.path.join(path, 'state.pickle'), 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'version': SNAPSHOT_VERSION, 'written_at': time.time(), 'symbols': symbols,
+                   'fields': list(bar_buffers.BAR_FIELDS), 'layout': layout}, f)
+
+    # Publish, then clear out older snapshots
+    pointer = os.path.join(snapshot_dir, _CURRENT)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(name)
+    os.replace(pointer + '.tmp', pointer)
+    for entry in os.listdir(snapshot_dir):
+        if entry.startswith('snapshot-') and entry != name:
+            shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
+    return path
+
+
+def load_snapshot(universe_bars, snapshot_dir=None):
+    """
+    Restore the ring buffers of the current snapshot into universe_bars and
+    return (state, written_at), or (None, None) when there is nothing usable.
+    Intervals whose capacity or dtype changed since the snapshot are left
+    empty and refetched.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    try:
+        with open(os.path.join(snapshot_dir, _CURRENT)) as f:
+            path = os.path.join(snapshot_dir, f.read().strip())
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if meta.get('version') != SNAPSHOT_VERSION or meta.get('fields') != list(bar_buffers.BAR_FIELDS):
+        print(f"Ignoring snapshot {path}: written by an incompatible version")
+        return None, None
+
+    try:
+        with open(os.path.join(path, 'state.pickle'), 'rb') as f:
+            state = pickle.load(f)
+    except Exception as e:
+        print(f"Error loading snapshot state from {path}: {e}")
+        return None, None
+
+    symbols = meta['symbols']
+    dtype = np.dtype(universe_bars.dtype).str
+    for interval, layout in meta['layout'].items():
+        if layout['capacity'] != bar_buffers.BAR_CAPACITY.get(interval) or layout['dtype'] != dtype:
+            print(f"Snapshot buffers for {interval} do not match the current layout, refetching them")
+            continue
+        # Copy-on-write: pages load lazily and the ring buffers can be written in place
+        timestamps = np.load(os.path.join(path, f'{interval}_timestamps.npy'), mmap_mode='c')
+        values = np.load(os.path.join(path, f'{interval}_values.npy'), mmap_mode='c')
+        cursor = np.load(os.path.join(path, f'{interval}_cursor.npy'))
+        for i, symbol in enumerate(symbols):
+            buffer = universe_bars.bars(symbol).buffers[interval]
+            buffer.timestamps = timestamps[i]
+            buffer.values = values[i]
+            buffer.size, buffer.head = int(cursor[i, 0]), int(cursor[i, 1])
+    return state, meta['written_at']
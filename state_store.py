@@ -0,0 +1,191 @@
+"""
+Versioned store of the latest indicators and alert types per symbol.
+
+Every cycle's results go through StateStore.update. The store version goes
+up by one whenever anything changed, and each symbol remembers the version
+it last changed at. That lets the server answer two questions cheaply:
+
+    snapshot()          everything, for a client that has nothing yet
+    delta(epoch, v)     only the symbols changed (or removed) since version v
+
+Messages use alert_batch's columnar layout, plus 'alerts' pairs for the
+symbols whose rules currently fire:
+
+    {
+        'epoch': '3f2a9c1e', 'version': 42, 'full': False, 'time': '10:15 AM',
+        'fields': [...], 'types': [...], 'symbols': [...], 'columns': [[...], ...],
+        'alerts': [[symbol index, type index], ...],
+        'removed': ['OLD.NS']
+    }
+
+The epoch is new for every store, so a client that reconnects after a
+server restart, or that is too far behind, gets a full snapshot instead.
+
+export() and apply() copy a store into another process: the web processes
+of a split deployment (see message_bus) keep mirrors of the worker's
+store, epoch and versions included, so a client can reconnect to any of
+them and still get a delta.
+"""
+import threading
+import uuid
+
+import alert_batch
+
+# Removed symbols remembered for deltas; older clients fall back to a snapshot
+MAX_TOMBSTONES = 1000
+
+
+def _compact_row(indicators, alerts):
+    return {'indicators': {key: alert_batch.compact_value(value) for key, value in indicators.items()},
+            'alerts': list(alerts)}
+
+
+class StateStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.time = None
+        self.rows = {}        # symbol -> {'indicators': {...}, 'alerts': [types]}
+        self.changed_at = {}  # symbol -> version of its last change
+        self.removed = {}     # symbol -> version it was removed at
+        self.floor = 0        # deltas from versions below this are no longer complete
+
+    def update(self, results, alert_types, time, symbols=None):
+        """
+        Replace the state with this cycle's results and the alert types
+        firing per symbol; returns the symbols that changed and went away.
+        With symbols, only those are covered and the rest are left alone.
+        """
+        rows = {symbol: _compact_row(indicators, alert_types.get(symbol, ()))
+                for symbol, indicators in results.items()}
+        with self.lock:
+            changed = [symbol for symbol, row in rows.items() if self.rows.get(symbol) != row]
+            covered = self.rows if symbols is None else [symbol for symbol in symbols if symbol in self.rows]
+            gone = [symbol for symbol in covered if symbol not in rows]
+            self.time = str(time)
+            if not changed and not gone:
+                return [], []
+            self.version += 1
+            for symbol in changed:
+                self.rows[symbol] = rows[symbol]
+                self.changed_at[symbol] = self.version
+                self.removed.pop(symbol, None)
+            for symbol in gone:
+                del self.rows[symbol]
+                del self.changed_at[symbol]
+                self.removed[symbol] = self.version
+            self._prune()
+            return changed, gone
+
+    def _prune(self):
+        if len(self.removed) > MAX_TOMBSTONES:
+            oldest = sorted(self.removed, key=self.removed.get)[:len(self.removed) - MAX_TOMBSTONES]
+            self.floor = max(self.floor, max(self.removed[symbol] for symbol in oldest))
+            for symbol in oldest:
+                del self.removed[symbol]
+
+    def export(self, since=None):
+        """
+        The rows changed after version `since` and the symbols removed since,
+        with their versions, or the whole store when since is None; JSON-safe,
+        for another process's apply().
+        """
+        with self.lock:
+            changed_at = {symbol: version for symbol, version in self.changed_at.items()
+                          if since is None or version > since}
+            return {
+                'epoch': self.epoch,
+                'version': self.version,
+                'since': since,
+                'floor': self.floor,
+                'time': self.time,
+                'rows': {symbol: self.rows[symbol] for symbol in changed_at},
+                'changed_at': changed_at,
+                'removed': {symbol: version for symbol, version in self.removed.items()
+                            if since is None or version > since},
+            }
+
+    def apply(self, update):
+        """
+        Mirror another store from its export(), epoch and versions included, so
+        clients can move between mirrors. Returns the symbols that changed and
+        went away, or None when a partial update starts after this store's
+        version and a full export is needed. A partial update that starts
+        earlier, because a newer full export overtook it, only adds what
+        changed after this store's version.
+        """
+        with self.lock:
+            if update['since'] is None:
+                if update['epoch'] == self.epoch:
+                    if update['version'] <= self.version:
+                        return [], []
+                    changed = [symbol for symbol, version in update['changed_at'].items() if version > self.version]
+                else:
+                    changed = list(update['rows'])
+                gone = [symbol for symbol in self.rows if symbol not in update['rows']]
+                self.epoch = update['epoch']
+                self.rows = dict(update['rows'])
+                self.changed_at = dict(update['changed_at'])
+                self.removed = dict(update['removed'])
+            elif update['epoch'] != self.epoch or update['since'] > self.version:
+                return None
+            elif update['version'] <= self.version:
+                return [], []
+            else:
+                rows = {symbol: row for symbol, row in update['rows'].items()
+                        if update['changed_at'][symbol] > self.version}
+                removed = {symbol: version for symbol, version in update['removed'].items() if version > self.version}
+                changed = list(rows)
+                gone = [symbol for symbol in removed if symbol in self.rows]
+                for symbol, row in rows.items():
+                    self.rows[symbol] = row
+                    self.changed_at[symbol] = update['changed_at'][symbol]
+                    self.removed.pop(symbol, None)
+                for symbol, version in removed.items():
+                    self.rows.pop(symbol, None)
+                    self.changed_at.pop(symbol, None)
+                    self.removed[symbol] = version
+            self.version = update['version']
+            self.floor = update['floor']
+            self.time = update['time']
+            self._prune()
+            return changed, gone
+
+    def _message(self, symbols, removed, full):
+        symbols = sorted(symbols)
+        fields, columns = alert_batch.encode_columns(
+            {symbol: self.rows[symbol]['indicators'] for symbol in symbols}, symbols)
+        pairs = [[i, alert_batch.ALERT_TYPES.index(alert_type)]
+                 for i, symbol in enumerate(symbols) for alert_type in self.rows[symbol]['alerts']]
+        return {
+            'epoch': self.epoch,
+            'version': self.version,
+            'full': full,
+            'time': self.time,
+            'fields': fields,
+            'types': alert_batch.ALERT_TYPES,
+            'symbols': symbols,
+            'columns': columns,
+            'alerts': pairs,
+            'removed': sorted(removed),
+        }
+
+    def _since(self, versions, since, watched):
+        return [symbol for symbol, version in versions.items()
+                if version > since and (watched is None or symbol in watched)]
+
+    def snapshot(self, watched=None):
+        """Full state, limited to the watched symbols when given."""
+        with self.lock:
+            return self._message([symbol for symbol in self.rows if watched is None or symbol in watched],
+                                 [], full=True)
+
+    def delta(self, epoch, since, watched=None):
+        """Changes after version `since`, or a full snapshot when that cannot be answered."""
+        with self.lock:
+            if epoch != self.epoch or not isinstance(since, int) or not self.floor <= since <= self.version:
+                return self._message([symbol for symbol in self.rows if watched is None or symbol in watched],
+                                     [], full=True)
+            return self._message(self._since(self.changed_at, since, watched),
+                                 self._since(self.removed, since, watched), full=False)
@@ -0,0 +1,211 @@
+"""
+Streaming RSI and EMA Bollinger %b with O(1) work per bar.
+
+Each symbol keeps running state (Wilder averages of gains and losses for
+RSI, the EMA and a rolling window sum/sum of squares for the bands), so a
+refresh only feeds the bars that arrived since the previous cycle. The
+bar that is still forming is evaluated provisionally and never committed.
+"""
+import math
+from collections import deque
+from datetime import timedelta
+
+import numpy as np
+
+import indicator_engine
+import lazy_imports
+from indicator_engine import RSI_LENGTH, BB_LENGTH, BB_STD
+
+pd = lazy_imports.lazy_import('pandas')
+
+# Hourly bars are still forming until a full hour has passed since they opened
+BAR_DURATION = timedelta(hours=1)
+
+
+class StreamingIndicators:
+    def __init__(self, rsi_length=RSI_LENGTH, bb_length=BB_LENGTH, bb_std=BB_STD):
+        self.rsi_length = rsi_length
+        self.bb_length = bb_length
+        self.bb_std = bb_std
+        self.reset()
+
+    def reset(self):
+        self.last_timestamp = None
+        self.count = 0
+        self.prev_value = None
+
+        # RSI: ta.rsi uses ewm(alpha=1/length, adjust=True), kept as weighted sums
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.weight_sum = 0.0
+        self.changes = 0
+
+        # Bands: SMA-seeded EMA plus the last bb_length values for the population std
+        self.ema = None
+        self.seed_sum = 0.0
+        self.window = deque()
+        self.window_sum = 0.0
+        self.window_sq_sum = 0.0
+
+        self.rsi = np.nan
+        self.bollinger_b = np.nan
+
+    def _rsi_state(self, value):
+        if self.prev_value is None:
+            return self.gain_sum, self.loss_sum, self.weight_sum, self.changes
+        change = value - self.prev_value
+        decay = 1.0 - 1.0 / self.rsi_length
+        gain_sum = max(change, 0.0) + decay * self.gain_sum
+        loss_sum = max(-change, 0.0) + decay * self.loss_sum
+        return gain_sum, loss_sum, 1.0 + decay * self.weight_sum, self.changes + 1
+
+    def _rsi_value(self, gain_sum, loss_sum, changes):
+        if changes < self.rsi_length or gain_sum + loss_sum == 0:
+            return np.nan
+        # The shared weight normalisation cancels out of the ratio
+        return 100 * gain_sum / (gain_sum + loss_sum)
+
+    def _band_state(self, value):
+        count = self.count + 1
+        seed_sum = self.seed_sum
+        ema = self.ema
+        if count < self.bb_length:
+            seed_sum += value
+        elif count == self.bb_length:
+            ema = (seed_sum + value) / self.bb_length
+        else:
+            ema += 2.0 / (self.bb_length + 1) * (value - ema)
+
+        window_sum = self.window_sum + value
+        window_sq_sum = self.window_sq_sum + value * value
+        if len(self.window) == self.bb_length:
+            oldest = self.window[0]
+            window_sum -= oldest
+            window_sq_sum -= oldest * oldest
+        return count, seed_sum, ema, window_sum, window_sq_sum
+
+    def _percent_b(self, value, count, ema, window_sum, window_sq_sum):
+        if ema is None or count < self.bb_length:
+            return np.nan
+        mean = window_sum / self.bb_length
+        std = math.sqrt(max(window_sq_sum / self.bb_length - mean * mean, 0.0))
+        if std == 0:
+            return np.nan
+        lower = ema - self.bb_std * std
+        upper = ema + self.bb_std * std
+        return (value - lower) / (upper - lower) * 100
+
+    def update(self, value, timestamp=None):
+        """Commit a completed bar and return (bollinger_b, rsi)."""
+        value = float(value)
+        gain_sum, loss_sum, weight_sum, changes = self._rsi_state(value)
+        count, seed_sum, ema, window_sum, window_sq_sum = self._band_state(value)
+
+        self.gain_sum, self.loss_sum, self.weight_sum, self.changes = gain_sum, loss_sum, weight_sum, changes
+        self.count, self.seed_sum, self.ema = count, seed_sum, ema
+        self.window.append(value)
+        if len(self.window) > self.bb_length:
+            self.window.popleft()
+        if count % self.bb_length == 0:
+            # Re-sum the window now and then so add/subtract rounding cannot drift
+            self.window_sum = math.fsum(self.window)
+            self.window_sq_sum = math.fsum(v * v for v in self.window)
+        else:
+            self.window_sum, self.window_sq_sum = window_sum, window_sq_sum
+        self.prev_value = value
+        self.last_timestamp = timestamp
+
+        self.rsi = self._rsi_value(gain_sum, loss_sum, changes)
+        self.bollinger_b = self._percent_b(value, count, ema, self.window_sum, self.window_sq_sum)
+        return self.bollinger_b, self.rsi
+
+    def provisional(self, value):
+        """Evaluate a bar that is still forming without changing any state."""
+        value = float(value)
+        gain_sum, loss_sum, _, changes = self._rsi_state(value)
+        count, _, ema, window_sum, window_sq_sum = self._band_state(value)
+        return (self._percent_b(value, count, ema, window_sum, window_sq_sum),
+                self._rsi_value(gain_sum, loss_sum, changes))
+
+
+def sync_from_bars(state, index, ohlc4, now):
+    """
+    Feed the bars (a DatetimeIndex and their OHLC4 values) that are newer
+    than the state's last committed bar. A still-forming last bar is only
+    evaluated provisionally.
+    """
+    if len(ohlc4) == 0:
+        return state.bollinger_b, state.rsi
+    start = 0
+    if state.last_timestamp is not None:
+        start = int(index.searchsorted(state.last_timestamp))
+        if start == len(index) or index[start] != state.last_timestamp:
+            # History no longer lines up with the state (gap or rewrite), start over
+            state.reset()
+            start = 0
+        else:
+            start += 1
+
+    forming = start < len(index) and index[-1] + BAR_DURATION > now
+    end = len(index) - 1 if forming else len(index)
+    for timestamp, value in zip(index[start:end], ohlc4[start:end].tolist()):
+        state.update(value, timestamp)
+    if forming:
+        return state.provisional(ohlc4[-1])
+    return state.bollinger_b, state.rsi
+
+
+def _field_panels(data_1h, stock_symbols):
+    """(rows x symbols) OHLC4 and Close arrays on the frame's own index."""
+    prices = np.stack([data_1h.xs(field, axis=1, level=1).reindex(columns=stock_symbols).to_numpy(dtype='float64')
+                       for field in ('Open', 'High', 'Low', 'Close')])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Like DataFrame.mean(axis=1), a missing field is left out of the average
+        ohlc4 = np.nansum(prices, axis=0) / (~np.isnan(prices)).sum(axis=0)
+    return ohlc4, prices[3]
+
+
+def compute_results(stock_data_1h, stock_data_daily, stock_data_minute, stock_symbols, states, now=None):
+    """
+    Engine results with %b and RSI read from the per-symbol states. Only the
+    hourly rows from the oldest committed bar on are looked at, so a warm
+    cycle costs the new bars, not the history; no hourly panels are built.
+    """
+    panels = indicator_engine.build_daily_panels(stock_data_daily, stock_data_minute, stock_symbols)
+    bollinger_b = np.full(len(stock_symbols), np.nan)
+    rsi = np.full(len(stock_symbols), np.nan)
+    value = np.full(len(stock_symbols), np.nan)
+    panels['count_1h'] = np.zeros(len(stock_symbols), dtype=np.int64)
+
+    if stock_data_1h is not None and not stock_data_1h.empty:
+        if not stock_data_1h.index.is_monotonic_increasing:
+            stock_data_1h = stock_data_1h.sort_index()
+        if now is None:
+            now = pd.Timestamp.now(tz=stock_data_1h.index.tz)
+        available = set(stock_data_1h.columns.get_level_values(0))
+        committed = [states[symbol].last_timestamp if symbol in states else None
+                     for symbol in stock_symbols if symbol in available]
+        start = 0
+        if committed and all(timestamp is not None for timestamp in committed):
+            start = stock_data_1h.index.searchsorted(min(committed))
+        tail = stock_data_1h.iloc[start:]
+        ohlc4, close = _field_panels(tail, stock_symbols)
+
+        for i, symbol in enumerate(stock_symbols):
+            if symbol not in available:
+                continue
+            state = states.setdefault(symbol, StreamingIndicators())
+            rows = np.flatnonzero(~np.isnan(close[:, i]))
+            index, symbol_ohlc4, symbol_close = tail.index[rows], ohlc4[rows, i], close[rows, i]
+            if state.last_timestamp is not None and state.last_timestamp not in index:
+                # Misaligned with the state, so sync_from_bars starts over: give it the whole history
+                full_ohlc4, full_close = _field_panels(stock_data_1h[[symbol]], [symbol])
+                rows = np.flatnonzero(~np.isnan(full_close[:, 0]))
+                index, symbol_ohlc4, symbol_close = stock_data_1h.index[rows], full_ohlc4[rows, 0], full_close[rows, 0]
+            bollinger_b[i], rsi[i] = sync_from_bars(state, index, symbol_ohlc4, now)
+            if len(symbol_close):
+                value[i] = symbol_close[-1]
+                # A still-forming last bar counts without being committed
+                panels['count_1h'][i] = state.count + int(index[-1] != state.last_timestamp)
+
+    return indicator_engine.results_from_panels(panels, stock_symbols, bollinger_b=bollinger_b, rsi=rsi, value=value)
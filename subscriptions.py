@@ -0,0 +1,95 @@
+"""
+Per-client symbol subscriptions backed by Socket.IO rooms.
+
+Clients that watch the same set of symbols share one room, and rooms are
+indexed by symbol, so routing a cycle's alerts costs one lookup per alert
+plus one emit per interested room, independent of how many clients are
+connected. Clients without a subscription sit in ALL_ROOM and get
+everything. A subscription to no symbols at all (an empty watch list, or
+one with only unknown names) gets a room that nothing is routed to.
+"""
+import hashlib
+import threading
+
+ALL_ROOM = 'all'
+
+
+def room_for(symbols):
+    if symbols is None:
+        return ALL_ROOM
+    digest = hashlib.sha1(','.join(sorted(symbols)).encode()).hexdigest()[:16]
+    return f'watch:{digest}'
+
+
+class SubscriptionIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client_rooms = {}   # sid -> room
+        self.room_symbols = {}   # room -> frozenset of symbols
+        self.room_members = {}   # room -> set of sids
+        self.symbol_rooms = {}   # symbol -> set of rooms
+
+    def subscribe(self, sid, symbols):
+        """
+        Move a client to the room for `symbols`, or ALL_ROOM when symbols is
+        None; returns (old_room, new_room).
+        """
+        symbols = None if symbols is None else frozenset(symbols)
+        new_room = room_for(symbols)
+        with self.lock:
+            old_room = self._remove(sid)
+            self.client_rooms[sid] = new_room
+            if new_room != ALL_ROOM:
+                if new_room not in self.room_members:
+                    self.room_members[new_room] = set()
+                    self.room_symbols[new_room] = symbols
+                    for symbol in symbols:
+                        self.symbol_rooms.setdefault(symbol, set()).add(new_room)
+                self.room_members[new_room].add(sid)
+        return old_room, new_room
+
+    def unsubscribe(self, sid):
+        with self.lock:
+            return self._remove(sid)
+
+    def _remove(self, sid):
+        room = self.client_rooms.pop(sid, ALL_ROOM)
+        members = self.room_members.get(room)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                # Last watcher gone, drop the room from the symbol index
+                del self.room_members[room]
+                for symbol in self.room_symbols.pop(room):
+                    rooms = self.symbol_rooms[symbol]
+                    rooms.discard(room)
+                    if not rooms:
+                        del self.symbol_rooms[symbol]
+        return room
+
+    def symbols_in(self, room):
+        """The symbols a room watches, None for ALL_ROOM."""
+        with self.lock:
+            return self.room_symbols.get(room)
+
+    def symbols_for(self, sid):
+        """The symbols a client watches, None when it gets everything."""
+        with self.lock:
+            return self.room_symbols.get(self.client_rooms.get(sid, ALL_ROOM))
+
+    def alerts_for(self, sid, alerts):
+        symbols = self.symbols_for(sid)
+        if symbols is None:
+            return list(alerts)
+        return [alert_data for alert_data in alerts if alert_data['symbol'] in symbols]
+
+    def route(self, alerts):
+        """Group alerts by the rooms that should receive them."""
+        if not alerts:
+            return {}
+        routed = {ALL_ROOM: list(alerts)}
+        with self.lock:
+            for alert_data in alerts:
+                for room in self.symbol_rooms.get(alert_data['symbol'], ()):
+                    routed.setdefault(room, []).append(alert_data)
+        return routed
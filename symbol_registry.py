@@ -0,0 +1,140 @@
+"""
+Cached record of which symbols Yahoo Finance actually serves.
+
+validate_symbols checks symbols concurrently with the smallest request that
+answers "does this ticker exist": five daily bars. Results are kept in a
+JSON registry, and app.py and bollinger %.py call filter_valid at startup
+so that known-bad symbols never take a download slot.
+
+Symbols that cannot be a Yahoo NSE/BSE ticker at all ('M.NS&M', 'ZOMATO.NS '
+with its trailing space) are rejected locally without a request.
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import lazy_imports
+
+yf = lazy_imports.lazy_import('yfinance')
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbol_registry.json')
+
+# How long a check result is trusted before the symbol is checked again
+REGISTRY_TTL_SECONDS = 7 * 24 * 60 * 60
+
+VALIDATION_WORKERS = 8
+
+# Index symbols (^NSEI) or exchange-suffixed tickers (M&M.NS, BAJAJ-AUTO.NS)
+SYMBOL_PATTERN = re.compile(r'\^[A-Z0-9.\-]+|[A-Z0-9&\-]+\.(NS|BO)')
+
+VALID = 'valid'
+INVALID = 'invalid'   # malformed, or Yahoo answered that it has no such symbol
+
+_lock = threading.Lock()
+
+
+def malformed_reason(symbol):
+    if symbol != symbol.strip():
+        return 'leading or trailing whitespace'
+    if not SYMBOL_PATTERN.fullmatch(symbol):
+        return 'not a Yahoo NSE/BSE ticker'
+    return None
+
+
+def load_registry(path=None):
+    path = path or REGISTRY_FILE
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading symbol registry {path}: {e}")
+        return {}
+
+
+def save_registry(registry, path=None):
+    path = path or REGISTRY_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(registry, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(entry, now=None, ttl=REGISTRY_TTL_SECONDS):
+    now = time.time() if now is None else now
+    return entry is not None and now - entry['checked_at'] < ttl
+
+
+def check_symbol(symbol):
+    """Return (status, reason); status is None when the check itself failed."""
+    reason = malformed_reason(symbol)
+    if reason is not None:
+        return INVALID, reason
+    try:
+        data = yf.Ticker(symbol).history(period='5d', interval='1d', raise_errors=True)
+    except yf.exceptions.YFPricesMissingError as e:
+        # Only Yahoo's own error for the chart is an answer about the symbol
+        reason = getattr(e, 'yahoo_reason', None)
+        if reason is not None:
+            return INVALID, reason
+        return None, str(e)
+    except Exception as e:
+        # Network trouble and throttling say nothing about the symbol, so they are not recorded
+        return None, str(e)
+    if data is None or data.empty:
+        return None, 'no data returned'
+    return VALID, None
+
+
+def validate_symbols(symbols, workers=VALIDATION_WORKERS, force=False, path=None, ttl=REGISTRY_TTL_SECONDS):
+    """
+    Check every symbol whose registry entry is missing or expired (all of
+    them with force) and save the results. Returns the registry entries
+    for the requested symbols.
+    """
+    with _lock:
+        registry = load_registry(path)
+    now = time.time()
+    pending = sorted({symbol for symbol in symbols
+                      if force or not is_fresh(registry.get(symbol), now, ttl)})
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            checked = list(zip(pending, pool.map(check_symbol, pending)))
+        with _lock:
+            # Re-read so concurrent validators do not drop each other's results
+            registry = load_registry(path)
+            for symbol, (status, reason) in checked:
+                if status is None:
+                    print(f"Error checking {symbol!r}: {reason}")
+                    continue
+                registry[symbol] = {'status': status, 'reason': reason, 'checked_at': now}
+            save_registry(registry, path)
+
+    return {symbol: registry[symbol] for symbol in symbols if symbol in registry}
+
+
+def filter_valid(symbols, path=None, ttl=REGISTRY_TTL_SECONDS):
+    """
+    Drop symbols that are malformed or that the registry recently found
+    invalid. Symbols the registry has not seen (or not recently) are kept.
+    """
+    registry = load_registry(path)
+    now = time.time()
+    kept = []
+    for symbol in symbols:
+        reason = malformed_reason(symbol)
+        if reason is None:
+            entry = registry.get(symbol)
+            if is_fresh(entry, now, ttl) and entry['status'] == INVALID:
+                reason = entry['reason']
+        if reason is not None:
+            print(f"Skipping {symbol!r}: {reason}")
+            continue
+        kept.append(symbol)
+    return kept
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+
+import bar_aggregation
+import bar_buffers
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_ohlcv import SyntheticMarket  # noqa: E402
+
+
+def test_cached_buckets_match_a_rebuild_once_the_ring_wraps():
+    symbols = [f'SYN{i}.NS' for i in range(3)]
+    # Well past the hourly ring's capacity, so its oldest bars are overwritten
+    data_1h = SyntheticMarket(bars={'1h': 2 * bar_buffers.BAR_CAPACITY['1h']}).download(symbols, interval='1h')
+
+    universe_bars = bar_buffers.UniverseBars()
+    aggregator = bar_aggregation.BarAggregator(universe_bars)
+    for chunk in np.array_split(np.arange(len(data_1h)), 12):
+        universe_bars.ingest('1h', data_1h.iloc[chunk])
+        for timeframe in ('2h', '1d'):
+            aggregator.update(timeframe, symbols)
+
+    for timeframe in ('2h', '1d'):
+        rebuilt = bar_aggregation.BarAggregator(universe_bars)
+        rebuilt.update(timeframe, symbols)
+        for symbol in symbols:
+            cached_stamps, cached_values = aggregator.bars(timeframe, symbol)
+            fresh_stamps, fresh_values = rebuilt.bars(timeframe, symbol)
+            np.testing.assert_array_equal(cached_stamps, fresh_stamps)
+            np.testing.assert_array_equal(cached_values, fresh_values)
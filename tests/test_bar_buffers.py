@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+
+import bar_buffers
+import bar_store
+import indicator_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_ohlcv import SyntheticMarket  # noqa: E402
+
+
+def test_ring_and_frames_paths_agree():
+    symbols = [f'SYN{i}.NS' for i in range(4)]
+    # More hours than both 3 months and the ring hold, so both paths have to trim
+    market = SyntheticMarket(bars={'1h': 600, '1d': 500})
+    data_1h = market.download(symbols, interval='1h')
+    data_daily = market.download(symbols, interval='1d')
+    data_minute = market.download(symbols, interval='1m')
+
+    frames_1h = bar_store.assemble_frame(
+        symbols, {symbol: bar_store._trim_to_period(data_1h[symbol], '3mo') for symbol in symbols})
+    expected = indicator_engine.compute_results(frames_1h, data_daily, data_minute, symbols)
+
+    universe_bars = bar_buffers.UniverseBars()
+    # Bars arrive over several cycles, the oldest ones before they leave the window
+    for chunk in np.array_split(np.arange(len(data_1h)), 5):
+        universe_bars.ingest('1h', data_1h.iloc[chunk])
+    universe_bars.ingest('1d', data_daily)
+    universe_bars.ingest('1m', data_minute)
+    start = bar_store.period_start('3mo', bar_buffers.MARKET_TZ)
+    universe_bars.drop_before('1h', start.value, symbols)
+    actual = indicator_engine.results_from_panels(universe_bars.panels(symbols), symbols)
+
+    assert list(universe_bars.counts('1h', symbols)) == [len(frames_1h[symbol].dropna()) for symbol in symbols]
+    assert actual.keys() == expected.keys()
+    for symbol in symbols:
+        for key in ('Bollinger_%b', 'RSI', 'Value'):
+            assert actual[symbol][key] == expected[symbol][key], (symbol, key)
@@ -0,0 +1,93 @@
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import bar_buffers
+import bar_ingest
+
+
+def _line(symbol, minute, close):
+    record = {'symbol': symbol, 'time': f'2026-10-16T10:{minute:02d}:00+05:30',
+              'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 100}
+    return json.dumps(record) + '\n'
+
+
+def _take(source, count, timeout=5.0):
+    """The first `count` bars, read on a thread so a stuck source fails the test instead of hanging it."""
+    bars = []
+
+    def run():
+        for bar in source:
+            bars.append(bar)
+            if len(bars) == count:
+                break
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    source.close()
+    return bars
+
+
+def test_file_source_skips_bad_lines_and_waits_for_unfinished_ones(tmp_path):
+    path = tmp_path / 'bars.jsonl'
+    path.write_text(_line('A.NS', 15, 10.0) + 'not json\n\n' + _line('B.NS', 15, 20.0) + _line('A.NS', 16, 11.0)[:20])
+    bars = list(bar_ingest.FileBarSource(str(path), follow=False))
+    assert [(bar.symbol, bar.close) for bar in bars] == [('A.NS', 10.0), ('B.NS', 20.0)]
+    assert bars[0].timestamp == pd.Timestamp('2026-10-16T10:15:00+05:30').value
+
+
+def test_file_source_follows_appended_lines(tmp_path):
+    path = tmp_path / 'bars.jsonl'
+    source = bar_ingest.FileBarSource(str(path), poll_seconds=0.01)
+
+    def append():
+        time.sleep(0.05)
+        line = _line('A.NS', 16, 11.0)
+        with open(path, 'a') as f:
+            f.write(_line('A.NS', 15, 10.0))
+            f.flush()
+            # A line written in two parts comes out once it is complete
+            f.write(line[:10])
+            f.flush()
+            time.sleep(0.05)
+            f.write(line[10:])
+
+    threading.Thread(target=append, daemon=True).start()
+    assert [bar.close for bar in _take(source, 2)] == [10.0, 11.0]
+
+
+def test_socket_source_reconnects_after_the_feed_drops():
+    server = socket.create_server(('127.0.0.1', 0))
+    port = server.getsockname()[1]
+    feeds = [_line('A.NS', 15, 10.0) + 'not json\n', _line('A.NS', 16, 11.0)]
+
+    def serve():
+        for feed in feeds:
+            connection, _ = server.accept()
+            with connection:
+                connection.sendall(feed.encode())
+
+    threading.Thread(target=serve, daemon=True).start()
+    source = bar_ingest.SocketBarSource('127.0.0.1', port, reconnect_seconds=0.01)
+    try:
+        assert [bar.close for bar in _take(source, 2)] == [10.0, 11.0]
+    finally:
+        server.close()
+
+
+def test_intraday_value_is_the_latest_minute_close():
+    universe_bars = bar_buffers.UniverseBars()
+    ingestor = bar_ingest.BarIngestor(universe_bars, threading.Lock())
+    today = pd.Timestamp.now(tz=bar_buffers.MARKET_TZ).normalize() + pd.Timedelta(hours=9, minutes=45)
+    for minute, close in enumerate([10.0, 12.0, 11.0]):
+        stamp = (today + pd.Timedelta(minutes=minute)).value
+        ingestor.ingest(bar_ingest.MinuteBar('A.NS', stamp, close, close + 1, close - 1, close, 100.0))
+
+    day_high, day_low, value = ingestor.intraday(['A.NS', 'B.NS'])
+    assert (day_high[0], day_low[0], value[0]) == (13.0, 9.0, 11.0)
+    assert np.isnan(value[1])
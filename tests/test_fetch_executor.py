@@ -0,0 +1,71 @@
+import threading
+import time
+import types
+
+import pandas as pd
+
+import fetch_executor
+
+
+class FakeTickers:
+    """yf.Ticker stand-in that records how many history() calls run at once."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, symbol):
+        return types.SimpleNamespace(history=lambda **kwargs: self.history(symbol, **kwargs))
+
+    def history(self, symbol, interval='1d', actions=False, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        index = pd.date_range('2024-01-01 09:15', periods=3, freq='h', tz='Asia/Kolkata')
+        return pd.DataFrame({'Close': [1.0, 2.0, float(len(symbol))]}, index=index)
+
+
+def _patch(monkeypatch, tickers):
+    monkeypatch.setattr(fetch_executor, 'yf', types.SimpleNamespace(Ticker=tickers))
+    monkeypatch.setattr(fetch_executor, 'rate_limiter', fetch_executor.RateLimiter(1000, 1000))
+
+
+def test_overlapping_downloads_run_side_by_side_and_keep_their_own_tickers(monkeypatch):
+    tickers = FakeTickers()
+    _patch(monkeypatch, tickers)
+
+    groups = {
+        'a': [f'A{i}.NS' for i in range(6)],
+        'b': [f'B{i}.NS' for i in range(6)],
+    }
+    results = {}
+    barrier = threading.Barrier(len(groups))
+
+    def run(name):
+        barrier.wait()
+        results[name] = fetch_executor.download(groups[name], chunk_size=3, period='1d', interval='1h')
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in groups]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tickers.peak > 1
+    for name, symbols in groups.items():
+        frame = results[name]
+        assert list(frame.columns.names) == ['Ticker', 'Price']
+        assert sorted(frame.columns.get_level_values(0).unique()) == sorted(symbols)
+        assert not frame.isna().any().any()
+
+
+def test_daily_bars_lose_their_timezone_like_yf_download(monkeypatch):
+    _patch(monkeypatch, FakeTickers(delay=0))
+    frame = fetch_executor.download(['A.NS'], period='5d', interval='1d')
+    assert frame.index.tz is None
+    assert fetch_executor.download(['A.NS'], period='5d', interval='1h').index.tz is not None
@@ -0,0 +1,44 @@
+import threading
+import time
+import types
+
+import pandas as pd
+
+import fetch_executor
+import pipeline
+
+INTERVAL_CODES = {'1h': 1.0, '1d': 2.0, '1m': 3.0}
+
+
+def test_interval_fetches_of_a_chunk_overlap_and_keep_their_own_frames(monkeypatch):
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+
+    def history(symbol, interval='1d', **kwargs):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+        time.sleep(0.01)
+        with lock:
+            running['now'] -= 1
+        index = pd.date_range('2024-01-01 09:15', periods=2, freq='h', tz='Asia/Kolkata')
+        return pd.DataFrame({'Close': INTERVAL_CODES[interval]}, index=index)
+
+    def ticker(symbol):
+        return types.SimpleNamespace(history=lambda **kwargs: history(symbol, **kwargs))
+
+    monkeypatch.setattr(fetch_executor, 'yf', types.SimpleNamespace(Ticker=ticker))
+    monkeypatch.setattr(fetch_executor, 'rate_limiter', fetch_executor.RateLimiter(1000, 1000))
+
+    def fetch(chunk, interval):
+        return fetch_executor.download(chunk, period='1d', interval=interval)
+
+    symbols = [f'S{i}.NS' for i in range(12)]
+    seen = []
+    for chunk, frames in pipeline.stream_chunks(symbols, list(INTERVAL_CODES), fetch, chunk_size=4):
+        seen.extend(chunk)
+        for interval, frame in frames.items():
+            assert sorted(frame.columns.get_level_values(0).unique()) == sorted(chunk)
+            assert (frame.xs('Close', axis=1, level=1) == INTERVAL_CODES[interval]).all().all()
+    assert sorted(seen) == sorted(symbols)
+    assert running['peak'] > 1
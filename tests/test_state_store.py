@@ -0,0 +1,54 @@
+import state_store
+
+
+def _update(store, values, symbols=None):
+    results = {symbol: {'Bollinger_%b': value, 'RSI': 50.0, 'Value': 100.0} for symbol, value in values.items()}
+    return store.update(results, {}, '10:15 AM', symbols)
+
+
+def test_mirror_applies_delta_overtaken_by_newer_full_export():
+    worker = state_store.StateStore()
+    mirror = state_store.StateStore()
+    _update(worker, {'A.NS': 1.0, 'B.NS': 2.0})
+    mirror.apply(worker.export())
+
+    previous = worker.version
+    _update(worker, {'A.NS': 3.0, 'B.NS': 2.0})
+    delta = worker.export(since=previous)
+    full = worker.export()
+    previous = worker.version
+    _update(worker, {'A.NS': 3.0, 'B.NS': 4.0, 'C.NS': 5.0})
+    late_delta = worker.export(since=previous)
+
+    # The full export overtakes the first delta on its way to the mirror
+    mirror.apply(full)
+    assert mirror.apply(delta) == ([], [])
+    assert mirror.apply(late_delta) == (['B.NS', 'C.NS'], [])
+    assert mirror.version == worker.version
+    assert mirror.rows == worker.rows
+
+
+def test_mirror_asks_for_full_export_after_missed_delta():
+    worker = state_store.StateStore()
+    mirror = state_store.StateStore()
+    _update(worker, {'A.NS': 1.0})
+    mirror.apply(worker.export())
+
+    _update(worker, {'A.NS': 2.0})
+    previous = worker.version
+    _update(worker, {'A.NS': 3.0})
+    assert mirror.apply(worker.export(since=previous)) is None
+
+
+def test_mirror_applies_only_newer_part_of_overlapping_delta():
+    worker = state_store.StateStore()
+    mirror = state_store.StateStore()
+    _update(worker, {'A.NS': 1.0, 'B.NS': 2.0})
+    since = worker.version
+    _update(worker, {'A.NS': 3.0, 'B.NS': 2.0})
+    mirror.apply(worker.export())
+    _update(worker, {'A.NS': 3.0}, symbols=['A.NS', 'B.NS'])
+
+    assert mirror.apply(worker.export(since=since)) == ([], ['B.NS'])
+    assert mirror.rows == worker.rows
+    assert mirror.removed == worker.removed
@@ -0,0 +1,19 @@
+import subscriptions
+
+
+def test_missing_watch_gets_everything_and_empty_watch_gets_nothing():
+    index = subscriptions.SubscriptionIndex()
+    alerts = [{'symbol': 'A.NS'}, {'symbol': 'B.NS'}]
+
+    assert index.subscribe('all-client', None) == (subscriptions.ALL_ROOM, subscriptions.ALL_ROOM)
+    _, empty_room = index.subscribe('empty-client', [])
+    _, watch_room = index.subscribe('watch-client', ['A.NS'])
+
+    assert empty_room not in (subscriptions.ALL_ROOM, watch_room)
+    assert index.symbols_for('all-client') is None
+    assert index.symbols_for('empty-client') == frozenset()
+    assert index.alerts_for('empty-client', alerts) == []
+    assert index.route(alerts) == {subscriptions.ALL_ROOM: alerts, watch_room: [{'symbol': 'A.NS'}]}
+
+    index.unsubscribe('empty-client')
+    assert index.symbols_for('empty-client') is None
@@ -0,0 +1,40 @@
+import types
+
+import pandas as pd
+from yfinance import exceptions
+
+import symbol_registry
+
+
+def _patch(monkeypatch, history, path):
+    ticker = types.SimpleNamespace(history=lambda **kwargs: history())
+    monkeypatch.setattr(symbol_registry, 'yf', types.SimpleNamespace(Ticker=lambda symbol: ticker,
+                                                                     exceptions=exceptions))
+    monkeypatch.setattr(symbol_registry, 'REGISTRY_FILE', str(path))
+
+
+def _raise(exception):
+    def history():
+        raise exception
+    return history
+
+
+def test_only_yahoos_own_answer_marks_a_symbol_invalid(monkeypatch, tmp_path):
+    path = tmp_path / 'registry.json'
+    _patch(monkeypatch, _raise(exceptions.YFPricesMissingError('NOPE.NS', '', yahoo_reason='No data found')), path)
+    entries = symbol_registry.validate_symbols(['NOPE.NS'])
+    assert entries['NOPE.NS']['status'] == symbol_registry.INVALID
+
+
+def test_empty_or_failed_checks_are_not_recorded(monkeypatch, tmp_path):
+    path = tmp_path / 'registry.json'
+    failures = [
+        lambda: pd.DataFrame(),
+        _raise(exceptions.YFRateLimitError()),
+        _raise(exceptions.YFPricesMissingError('A.NS', ' (period=5d)')),
+        _raise(ConnectionError('reset by peer')),
+    ]
+    for history in failures:
+        _patch(monkeypatch, history, path)
+        assert symbol_registry.validate_symbols(['A.NS']) == {}
+    assert symbol_registry.filter_valid(['A.NS']) == ['A.NS']
@@ -0,0 +1,106 @@
+"""
+The symbol universe, kept in one file: universe.json.
+
+    {
+      "watch":   [...],          # symbols the alert server monitors (app.py)
+      "groups":  {"^NSEBANK": [...], ...},   # sector groups clients can subscribe to
+      "scan":    [...],          # daily Bollinger %b scan (bollinger %.py)
+      "check":   [...],          # extra symbols for check_symbols.py
+      "reference": [...]         # the wider NSE list kept for lookups
+    }
+
+UniverseWatcher polls the file's modification time from a daemon thread and
+calls back with the loaded universe whenever it changes, so the server can
+pick up edits without a restart.
+"""
+import json
+import os
+import threading
+
+UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universe.json')
+
+UNIVERSE_POLL_SECONDS = 5
+
+LISTS = ('watch', 'scan', 'check', 'reference')
+
+
+def load_universe(path=None):
+    with open(path or UNIVERSE_FILE) as f:
+        universe = json.load(f)
+    for name in LISTS:
+        universe.setdefault(name, [])
+    universe.setdefault('groups', {})
+    return universe
+
+
+def symbols(name, path=None):
+    return list(load_universe(path)[name])
+
+
+def all_symbols(universe):
+    """Every symbol in the file, first occurrence order."""
+    seen = {}
+    for name in LISTS:
+        for symbol in universe[name]:
+            seen.setdefault(symbol, None)
+    for group in universe['groups'].values():
+        for symbol in group:
+            seen.setdefault(symbol, None)
+    return list(seen)
+
+
+def diff(old_symbols, new_symbols):
+    """(added, removed), each in the order of the list it came from."""
+    old_set = set(old_symbols)
+    new_set = set(new_symbols)
+    return ([symbol for symbol in new_symbols if symbol not in old_set],
+            [symbol for symbol in old_symbols if symbol not in new_set])
+
+
+class UniverseWatcher:
+    def __init__(self, on_change, path=None, poll_seconds=UNIVERSE_POLL_SECONDS):
+        self.on_change = on_change
+        self.path = path or UNIVERSE_FILE
+        self.poll_seconds = poll_seconds
+        self._mtime = self._current_mtime()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def check(self):
+        """Call on_change if the file changed since the last check; returns whether it did."""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        try:
+            universe = load_universe(self.path)
+        except (OSError, ValueError) as e:
+            # Probably caught mid-write; the next poll sees the finished file
+            print(f"Error reading universe file {self.path}: {e}")
+            return False
+        # Only marked as seen once applied, so a failed change is retried on the next poll
+        self.on_change(universe)
+        self._mtime = mtime
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error applying universe change: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()